@@ -0,0 +1,338 @@
+import time
+T_START = time.perf_counter() # Process start, for time-to-first-frame
+
+import pygame
+import sys
+import os
+import json
+import argparse
+
+from telemetry_health import TelemetryHealth, PACKET_NAMES
+from state_shm import StateReader, StateView, VisionReader
+from relay import RelayClient
+from vision_preview import VisionPreview, STALE_AFTER
+
+# --- LOAD CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_PATH = os.path.join(BASE_DIR, "config", "settings.json")
+
+with open(CONFIG_PATH, "r") as f:
+    CONFIG = json.load(f)
+
+DEFAULT_RES = (CONFIG["display"]["width"], CONFIG["display"]["height"])
+FPS = CONFIG["display"]["fps"]
+
+# --- TEAM COLORS ---
+TEAMS = {
+    0: (0, 210, 190), 1: (220, 0, 0), 2: (6, 25, 147), 3: (0, 90, 255),
+    4: (0, 110, 0), 5: (255, 128, 0), 6: (240, 240, 240), 7: (43, 69, 98),
+    8: (155, 0, 0), 9: (0, 144, 255), 255: (180, 0, 255)
+}
+
+# --- COLORS ---
+BLACK, DARK_BG = (8, 8, 10), (15, 15, 20)
+WHITE, GREEN, RED = (240, 240, 240), (50, 255, 50), (255, 50, 50)
+GRAY_DEFAULT = (80, 80, 80)
+CYAN, YELLOW = (0, 255, 255), (255, 215, 0)
+ORANGE = (255, 140, 0)
+
+# --- BRAIN READINESS BADGE ---
+STATUS_COLORS = {"loading": YELLOW, "warming": YELLOW, "ready": GREEN, "degraded": ORANGE}
+
+# --- TRACK MAPPER ---
+class SmartTrackMap:
+    def __init__(self):
+        self.points = []
+        self.min_x = -500; self.max_x = 500
+        self.min_z = -500; self.max_z = 500
+
+    def add_point(self, x, z, sector):
+        if not self.points or (abs(x - self.points[-1][0]) > 2 or abs(z - self.points[-1][1]) > 2):
+            self.points.append([x, z, sector])
+            self.min_x = min(self.min_x, x); self.max_x = max(self.max_x, x)
+            self.min_z = min(self.min_z, z); self.max_z = max(self.max_z, z)
+
+    def to_screen(self, x, z, draw_rect):
+        w = max(1, self.max_x - self.min_x)
+        h = max(1, self.max_z - self.min_z)
+        nx = (x - self.min_x) / w
+        nz = (z - self.min_z) / h
+
+        pad_w = draw_rect.width * 0.05
+        pad_h = draw_rect.height * 0.05
+
+        sx = draw_rect.x + pad_w + (nx * (draw_rect.width - (pad_w*2)))
+        sy = draw_rect.y + draw_rect.height - pad_h - (nz * (draw_rect.height - (pad_h*2)))
+        return int(sx), int(sy)
+
+# --- HEALTH OVERLAY (F3) ---
+def draw_health_overlay(screen, font, snap):
+    lines = [f"{'PKT':<9}{'PPS':>6}{'KB/S':>8}{'DEC us':>8}{'GAP':>5}{'DROP':>6}{'OOO':>5}"]
+    for pid, p in snap["packets"].items():
+        lines.append(
+            f"{PACKET_NAMES.get(pid, pid):<9}{p['pps']:>6.0f}{p['bps'] / 1024:>8.1f}"
+            f"{p['decode_avg_us']:>8.0f}{p['frame_gap']:>5}{p['dropped']:>6}{p['out_of_order']:>5}"
+        )
+    r = snap["render"]
+    if "startup" in snap:
+        ttff, ttr = snap["startup"]
+        lines.append(f"STARTUP first frame {ttff:.2f}s / ready " + (f"{ttr:.1f}s" if ttr is not None else "--"))
+    lines.append(f"RENDER {r['frame_avg_ms']:.1f}ms avg / {r['frame_max_ms']:.1f}ms max "
+                 f"(budget {r['budget_ms']:.1f}ms, over {r['over_budget']})")
+    v = snap.get("vision")
+    if v and not v["available"]:
+        lines.append("VISION preview off (no OpenCV)")
+    elif v and v["decoded"]:
+        age = f"{v['age_ms']:.0f}ms" + (" +pending" if v["behind"] else "")
+        lines.append(f"VISION decode {v['decode_avg_ms']:.1f}ms avg / {v['decode_max_ms']:.1f}ms max, "
+                     f"age {age}, skipped {v['skipped']}")
+    if snap["malformed"]: lines.append(f"MALFORMED: {snap['malformed']}")
+
+    line_h = font.get_linesize()
+    width = max(font.size(l)[0] for l in lines) + 20
+    panel = pygame.Surface((width, line_h * len(lines) + 20), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 200))
+    for i, line in enumerate(lines):
+        col = CYAN if i == 0 else WHITE
+        panel.blit(font.render(line, True, col), (10, 10 + i * line_h))
+    W, H = screen.get_size()
+    screen.blit(panel, (W - width - 20, H - panel.get_height() - 50))
+
+# --- STATE SOURCE: SHARED MEMORY (separate process) ---
+class ShmSource:
+    """Attaches read-only to a Brain's published state. COPILOT toggle is display-only."""
+    def __init__(self, rig_id):
+        self.rig_id = rig_id
+        self.reader = None
+        self.vision_reader = None
+
+    def current(self):
+        if self.reader is None:
+            try:
+                self.reader = StateReader(self.rig_id)
+                print(f"✅ DASHBOARD: Attached to {self.reader.name}")
+            except FileNotFoundError:
+                return None  # Brain not up yet, retry next frame
+        return self.reader.read()
+
+    def health(self, view): return dict(view.health)
+    def readiness(self, view): return view.brain_status, view.time_to_ready
+    def vision(self, view):
+        if not view.vision_data: return None
+        if self.vision_reader is None:
+            try: self.vision_reader = VisionReader(self.rig_id)
+            except FileNotFoundError: return None
+        frame = self.vision_reader.read()
+        if frame is None: return None
+        frame_id, jpeg, received = frame
+        return (view.rig_id, frame_id), jpeg, received
+    def toggle(self, view): pass
+    def cycle(self): pass
+    def rig_label(self, view): return f"RIG: {view.rig_id} (read-only)"
+
+# --- STATE SOURCE: TELEMETRY RELAY (other PC, e.g. the pit wall) ---
+class RelaySource(ShmSource):
+    """Same read-only view as ShmSource, fed by the Brain's delta-encoded relay."""
+    def __init__(self, host, port, rig_id, max_hz):
+        self.rig_id = rig_id
+        self.client = RelayClient(host, port, rig_id, max_hz)
+        self.view = None
+
+    def current(self):
+        for view in self.client.poll(timeout=0):
+            self.view = view
+        return self.view
+
+    def vision(self, view): return None  # JPEGs are not relayed
+    def rig_label(self, view): return f"RIG: {view.rig_id} (relay)"
+
+# --- MAIN GUI ---
+def run_dashboard(source, caption="F1 NEURAL COPILOT v1.0", t_start=T_START, render_health=None):
+    """Renders whatever `source` exposes: current(), health(view), readiness(view),
+    vision(view), toggle(view), cycle(), rig_label(view).
+
+    Frame times go to `render_health` (a TelemetryHealth) so the caller can read
+    them; a private one is used when none is given."""
+    pygame.init()
+    screen = pygame.display.set_mode(DEFAULT_RES, pygame.RESIZABLE)
+    pygame.display.set_caption(caption)
+    clock = pygame.time.Clock()
+
+    print(f"✅ DASHBOARD: Online ({FPS} FPS)")
+
+    idle_view = StateView() # Shown until the first rig connects
+    render_health = render_health or TelemetryHealth(FPS) # Dashboard frame times
+    tracks = {} # rig_id -> SmartTrackMap
+    preview = VisionPreview() # Decodes camera frames off the render thread
+    preview.start()
+    show_health = False
+    time_to_first_frame = None
+
+    running = True
+    while running:
+        frame_start = time.perf_counter()
+        state = source.current() or idle_view
+
+        # --- DYNAMIC RESIZING ---
+        W, H = screen.get_size()
+        RECT_GRID = pygame.Rect(int(W * 0.02), int(H * 0.12), int(W * 0.25), int(H * 0.85))
+        RECT_MAP = pygame.Rect(int(W * 0.29), int(H * 0.12), int(W * 0.69), int(H * 0.85))
+
+        F_SMALL = pygame.font.SysFont("Consolas", int(H * 0.015))
+        F_MED = pygame.font.SysFont("Consolas", int(H * 0.022), bold=True)
+        F_LARGE = pygame.font.SysFont("Consolas", int(H * 0.05), bold=True)
+
+        # INPUT
+        mouse_pos = pygame.mouse.get_pos()
+        click = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT: running = False
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1: click = True
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                show_health = not show_health
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                source.cycle()
+
+        btn_eng = pygame.Rect(int(W * 0.02), int(H * 0.02), int(W * 0.15), int(H * 0.06))
+        if click and btn_eng.collidepoint(mouse_pos):
+            source.toggle(state)
+
+        # --- LOGIC ---
+        # Snapshot: the Brain mutates state.cars concurrently
+        cars = dict(state.cars)
+        standings = state.standings
+
+        preview.submit(source.vision(state))
+
+        track_logic = tracks.setdefault(state.rig_id, SmartTrackMap())
+        me = cars.get(state.player_idx)
+        if me and 'x' in me:
+            track_logic.add_point(me['x'], me['z'], state.telemetry['sector'])
+
+        # RENDER
+        screen.fill(BLACK)
+
+        col = GREEN if state.active else RED
+        pygame.draw.rect(screen, col, btn_eng, border_radius=8)
+        eng_txt = F_MED.render(f"COPILOT: {'ON' if state.active else 'OFF'}", True, BLACK)
+        screen.blit(eng_txt, (btn_eng.centerx - eng_txt.get_width()//2, btn_eng.centery - eng_txt.get_height()//2))
+
+        rig_lbl = F_MED.render(source.rig_label(state), True, CYAN)
+        screen.blit(rig_lbl, (btn_eng.right + 20, btn_eng.centery - rig_lbl.get_height()//2))
+
+        status, time_to_ready = source.readiness(state)
+        ai_txt = f"AI: {status.upper()}" if status else "AI: WAITING FOR BRAIN"
+        if status in ("ready", "degraded") and time_to_ready is not None: ai_txt += f" ({time_to_ready:.1f}s)"
+        ai_lbl = F_MED.render(ai_txt, True, STATUS_COLORS.get(status, GRAY_DEFAULT))
+        screen.blit(ai_lbl, (btn_eng.right + 40 + rig_lbl.get_width(), btn_eng.centery - ai_lbl.get_height()//2))
+
+        # Show Vision Status on Screen
+        vis_col = GREEN if state.vision_data else RED
+        pygame.draw.circle(screen, vis_col, (W - 30, H - 30), 10)
+
+        sec = state.telemetry['lap_time'] / 1000.0
+        m, s = int(sec // 60), sec % 60
+        t_str = f"LAP: {m}:{s:05.2f}"
+        time_lbl = F_LARGE.render(t_str, True, WHITE)
+        screen.blit(time_lbl, (W - time_lbl.get_width() - 40, int(H * 0.02)))
+
+        # GRID PANEL
+        pygame.draw.rect(screen, DARK_BG, RECT_GRID)
+        grid_title = F_MED.render("LIVE STANDINGS", True, CYAN)
+        screen.blit(grid_title, (RECT_GRID.x + 20, RECT_GRID.y + 10))
+
+        y_offset = RECT_GRID.y + 50
+        row_h = int(RECT_GRID.height / 22)
+        rank = 1
+
+        for idx, car, gap in standings:
+            tid = car.get('team', -1)
+            t_col = TEAMS.get(tid, GRAY_DEFAULT)
+            is_player = (idx == state.player_idx)
+
+            gap_txt = "Leader" if rank == 1 else f"+{gap:.2f}s"
+
+            bg_col = (40, 40, 60) if is_player else DARK_BG
+            r_rect = pygame.Rect(RECT_GRID.x + 10, y_offset, RECT_GRID.width - 20, row_h - 4)
+            pygame.draw.rect(screen, bg_col, r_rect)
+            pygame.draw.rect(screen, t_col, (r_rect.x + 5, r_rect.y + 5, 5, r_rect.height - 10))
+
+            name = car.get('name', f"CAR {idx}")
+            row_txt = f"P{rank:02d} {name:<4} {gap_txt}"
+            txt_surf = F_SMALL.render(row_txt, True, WHITE if not is_player else CYAN)
+            screen.blit(txt_surf, (r_rect.x + 20, r_rect.centery - txt_surf.get_height()//2))
+
+            y_offset += row_h
+            rank += 1
+            if y_offset > RECT_GRID.bottom: break
+
+        # MAP PANEL
+        pygame.draw.rect(screen, (20, 20, 25), RECT_MAP, 2)
+
+        if len(track_logic.points) > 2:
+            pts = track_logic.points
+            step = 1 if len(pts) < 1000 else 2
+            for i in range(0, len(pts)-step, step):
+                p1 = track_logic.to_screen(pts[i][0], pts[i][1], RECT_MAP)
+                p2 = track_logic.to_screen(pts[i+step][0], pts[i+step][1], RECT_MAP)
+                if pts[i][2] != pts[i+step][2]: pygame.draw.circle(screen, WHITE, p1, 3)
+                pygame.draw.line(screen, WHITE, p1, p2, 2)
+
+        for idx, car in cars.items():
+            if 'x' in car:
+                sx, sy = track_logic.to_screen(car['x'], car['z'], RECT_MAP)
+                tid = car.get('team', -1)
+                t_col = TEAMS.get(tid, GRAY_DEFAULT)
+
+                if idx == state.player_idx:
+                    pygame.draw.circle(screen, WHITE, (sx, sy), 8, 2)
+                    pygame.draw.circle(screen, CYAN, (sx, sy), 5)
+                else:
+                    pygame.draw.rect(screen, t_col, (sx-3, sy-3, 6, 6))
+                    if 'name' in car:
+                        lbl = F_SMALL.render(car['name'], True, t_col)
+                        screen.blit(lbl, (sx, sy-15))
+
+        # VISION PREVIEW (already decoded: blit only)
+        shown = preview.frame
+        if shown and shown[0][0] == state.rig_id:
+            surf = shown[1]
+            pos = (RECT_MAP.right - surf.get_width() - 10, RECT_MAP.y + 10)
+            age = preview.age()
+            pygame.draw.rect(screen, RED if age > STALE_AFTER else DARK_BG,
+                             (pos[0] - 2, pos[1] - 2, surf.get_width() + 4, surf.get_height() + 4), 2)
+            screen.blit(surf, pos)
+            cam_lbl = F_SMALL.render(f"CAM {age:.1f}s", True, RED if age > STALE_AFTER else WHITE)
+            screen.blit(cam_lbl, (pos[0] + 6, pos[1] + surf.get_height() - cam_lbl.get_height() - 4))
+
+        if show_health:
+            snap = source.health(state)
+            snap["vision"] = preview.snapshot()
+            snap["render"] = render_health.snapshot()["render"]
+            snap["startup"] = (time_to_first_frame or 0.0, time_to_ready)
+            draw_health_overlay(screen, F_SMALL, snap)
+
+        render_health.record_frame(time.perf_counter() - frame_start)
+        pygame.display.flip()
+        if time_to_first_frame is None:
+            time_to_first_frame = time.perf_counter() - t_start
+            print(f"⏱️  DASHBOARD: First frame in {time_to_first_frame:.2f}s")
+        clock.tick(FPS)
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard attached to a (headless) Brain via shared memory")
+    parser.add_argument("--rig", default=CONFIG["network"].get("rig_id") or "RIG-1",
+                        help="Rig ID to display (see 'rigs' in settings.json)")
+    parser.add_argument("--relay", metavar="HOST:PORT",
+                        help="Read from a Brain's telemetry relay instead of local shared memory")
+    parser.add_argument("--hz", type=float, default=FPS, help="Max relay update rate")
+    args = parser.parse_args()
+    if args.relay:
+        host, _, port = args.relay.rpartition(":")
+        source = RelaySource(host, int(port), args.rig, args.hz)
+    else:
+        source = ShmSource(args.rig)
+    run_dashboard(source, caption=f"F1 NEURAL COPILOT - {args.rig}")
@@ -0,0 +1,75 @@
+import threading
+
+from prompt_builder import estimate_tokens
+
+NS_PER_MS = 1_000_000
+
+
+# --- POOLED OLLAMA CLIENT ---
+class LLMClient:
+    """One persistent ollama.Client (keep-alive HTTP pool) shared by every query.
+
+    keep_alive also tells Ollama to hold the model in memory between questions.
+    Each reply records prompt-eval cost; Ollama only counts prompt tokens it had
+    to evaluate, so a low count versus the full prompt size means the KV cache
+    for the shared prefix was reused. The full size is an estimate: chars / 4,
+    scaled by how far off that was on the first call (cold cache, chat template
+    included). If Ollama already had the prefix cached from an earlier process,
+    the first call undercounts and the reuse estimate reads low.
+    """
+    def __init__(self, model, host=None, keep_alive="30m", timeout=30.0):
+        self.model = model
+        self.host = host
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.client = None
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.prompt_tokens_est = 0
+        self.token_scale = None   # Real / estimated prompt tokens, measured on the first call
+        self.prompt_tokens_eval = 0
+        self.prompt_eval_ms = 0.0
+        self.last = {}
+
+    def _get_client(self):
+        if self.client is None:
+            with self.lock:
+                if self.client is None:
+                    import ollama # Lazy: see ModelLoader
+                    self.client = ollama.Client(host=self.host, timeout=self.timeout)
+        return self.client
+
+    def chat(self, messages):
+        res = self._get_client().chat(model=self.model, messages=messages, keep_alive=self.keep_alive)
+        self._record(messages, res)
+        return res['message']['content']
+
+    def _record(self, messages, res):
+        evaluated = res.get('prompt_eval_count') or 0
+        eval_ms = (res.get('prompt_eval_duration') or 0) / NS_PER_MS
+        raw_est = sum(estimate_tokens(m['content']) for m in messages)
+        with self.lock:
+            if self.token_scale is None and evaluated:
+                self.token_scale = evaluated / raw_est
+            est = round(raw_est * (self.token_scale or 1.0))
+            self.calls += 1
+            self.prompt_tokens_est += est
+            self.prompt_tokens_eval += evaluated
+            self.prompt_eval_ms += eval_ms
+            self.last = {
+                "prompt_tokens_est": est,
+                "prompt_eval_count": evaluated,
+                "prompt_eval_ms": round(eval_ms, 1),
+                "gen_ms": round((res.get('eval_duration') or 0) / NS_PER_MS, 1),
+                "cache_reuse_est": round(max(0.0, 1.0 - evaluated / est), 2) if est else 0.0,
+            }
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "calls": self.calls,
+                "prompt_eval_ms_avg": round(self.prompt_eval_ms / self.calls, 1) if self.calls else 0.0,
+                "cache_reuse_est_avg": round(max(0.0, 1.0 - self.prompt_tokens_eval / self.prompt_tokens_est), 2)
+                                       if self.prompt_tokens_est else 0.0,
+                "last": dict(self.last),
+            }
@@ -1,19 +1,27 @@
-import pygame
-import socket
-import struct
-import threading
 import time
-import math
+T_START = time.perf_counter() # Process start: reference for time-to-first-frame / time-to-ready
+
+import struct
 import sys
 import os
 import wave
+import io
 import json
-import ollama
-from faster_whisper import WhisperModel
-from pydub import AudioSegment
+import atexit
+import argparse
 
 # Import from the renamed voice_core module
 from voice_core import RaceEngineerVoice 
+from telemetry_health import TelemetryHealth, HEADER_SIZE, HEADER_TIMING, HEADER_TIMING_OFFSET
+from timing import TimingIndex
+from net_core import NetworkCore, FairScheduler
+from rig_sessions import SessionRegistry
+from state_shm import StatePublisher, VisionPublisher
+from model_loader import ModelLoader
+from prompt_builder import ConversationMemory, build_messages, user_turn, SYSTEM_PREFIX
+from llm_client import LLMClient
+from response_cache import ResponseCache, telemetry_signature
+from relay import TelemetryRelay
 
 # --- LOAD CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -31,27 +39,30 @@ with open(CONFIG_PATH, "r") as f:
 UDP_PORT = CONFIG["network"]["udp_telemetry_port"]
 EARS_PORT = CONFIG["network"]["ears_port"]
 VISION_PORT = CONFIG["network"]["vision_port"]  # <--- NEW
-DEFAULT_RES = (CONFIG["display"]["width"], CONFIG["display"]["height"])
 FPS = CONFIG["display"]["fps"]
+PUBLISH_INTERVAL = 1.0 / FPS # Shared memory refresh, matches the dashboard frame rate
+IDLE_PUBLISH_INTERVAL = 0.25 # Refresh without telemetry (menus, Brain still loading)
 WHISPER_MODEL_NAME = CONFIG["ai"]["whisper_model"]
 OLLAMA_MODEL_NAME = CONFIG["ai"]["ollama_model"]
-
-# --- TEAM COLORS ---
-TEAMS = {
-    0: (0, 210, 190), 1: (220, 0, 0), 2: (6, 25, 147), 3: (0, 90, 255),
-    4: (0, 110, 0), 5: (255, 128, 0), 6: (240, 240, 240), 7: (43, 69, 98),
-    8: (155, 0, 0), 9: (0, 144, 255), 255: (180, 0, 255)
-}
-
-# --- COLORS ---
-BLACK, DARK_BG = (8, 8, 10), (15, 15, 20)
-WHITE, GREEN, RED = (240, 240, 240), (50, 255, 50), (255, 50, 50)
-GRAY_DEFAULT = (80, 80, 80)
-CYAN, YELLOW = (0, 255, 255), (255, 215, 0)
-
-# --- SHARED STATE ---
+OLLAMA_HOST = CONFIG["ai"].get("ollama_host") # None = ollama's default (OLLAMA_HOST env or localhost)
+OLLAMA_KEEP_ALIVE = CONFIG["ai"].get("keep_alive", "30m") # How long Ollama keeps the model loaded between questions
+HISTORY_TURNS = CONFIG["ai"].get("history_turns", 6)
+HISTORY_TOKEN_BUDGET = CONFIG["ai"].get("history_token_budget", 600)
+CACHE_SIZE = CONFIG["ai"].get("cache_size", 64)
+CACHE_TTL = CONFIG["ai"].get("cache_ttl", 15.0) # s; answers also expire when a telemetry bucket changes
+INFERENCE_WORKERS = CONFIG["ai"].get("inference_workers", 1)
+MAX_PENDING_QUERIES = CONFIG["ai"].get("max_pending_queries", 2)  # Per rig: running + queued before new queries are shed
+RIG_ALIASES = CONFIG.get("rigs", {})  # "host" or "host:port" -> rig ID
+MAX_RIGS = CONFIG["network"].get("max_rigs", 8)  # Open sessions; the least recently heard rig is evicted
+RIG_IDLE_TIMEOUT = CONFIG["network"].get("rig_idle_timeout", 300)  # s of silence before an unlisted rig is dropped
+LISTED_RIGS_ONLY = CONFIG["network"].get("listed_rigs_only", False)  # Ignore hosts / IDs not in "rigs"
+RELAY = CONFIG.get("relay", {}) # Decoded-state fan-out for secondary screens; no "port" = disabled
+
+# --- PER-RIG STATE ---
 class SharedState:
-    def __init__(self):
+    def __init__(self, rig_id="--", host=None):
+        self.rig_id = rig_id
+        self.host = host
         self.active = True
         self.cars = {} 
         self.player_idx = 0
@@ -63,372 +74,303 @@ class SharedState:
         }
         self.packet_health = {0:0, 2:0, 4:0, 6:0} 
         self.vision_data = None # <--- NEW: Store latest image frame
-
-state = SharedState()
-
-# --- TRACK MAPPER ---
-class SmartTrackMap:
-    def __init__(self):
-        self.points = [] 
-        self.min_x = -500; self.max_x = 500
-        self.min_z = -500; self.max_z = 500
-
-    def add_point(self, x, z, sector):
-        if not self.points or (abs(x - self.points[-1][0]) > 2 or abs(z - self.points[-1][1]) > 2):
-            self.points.append([x, z, sector])
-            self.min_x = min(self.min_x, x); self.max_x = max(self.max_x, x)
-            self.min_z = min(self.min_z, z); self.max_z = max(self.max_z, z)
-
-    def to_screen(self, x, z, draw_rect):
-        w = max(1, self.max_x - self.min_x)
-        h = max(1, self.max_z - self.min_z)
-        nx = (x - self.min_x) / w
-        nz = (z - self.min_z) / h
+        self.vision_frame = 0 # Frames received, so dashboards decode each one once
+        self.vision_received = 0.0 # Unix time of the latest frame (preview staleness)
+        self.health = TelemetryHealth(FPS) # Rates, decode cost, drops (snapshot() for benchmarks; render times: render_health)
+        self.standings = [] # [(idx, car, gap to car ahead in s)], leader first
+        self.timing = TimingIndex() # Minisector crossing times -> O(1) intervals
+        self.voice = RaceEngineerVoice(host) if host else None # Speech queue back to this rig
+        self.memory = ConversationMemory(HISTORY_TURNS, HISTORY_TOKEN_BUDGET) # Recent radio exchanges
+        self.publisher = StatePublisher(rig_id) # Read-only view for dashboard processes
+        self.vision_publisher = VisionPublisher(rig_id) # Latest JPEG for dashboard previews
+        self.last_publish = 0.0
+
+    def close(self):
+        self.publisher.close()
+        self.vision_publisher.close()
+        if self.voice: self.voice.close()
+
+    def publish(self, now):
+        if now - self.last_publish < PUBLISH_INTERVAL: return
+        self.last_publish = now
+        self.publisher.publish(self, self.health.snapshot(),
+                               model_loader.status, model_loader.time_to_ready)
+
+registry = SessionRegistry(SharedState, RIG_ALIASES, MAX_RIGS, RIG_IDLE_TIMEOUT, LISTED_RIGS_ONLY,
+                           on_evict=lambda session: session.close())
+llm = LLMClient(OLLAMA_MODEL_NAME, OLLAMA_HOST, OLLAMA_KEEP_ALIVE) # Shared by every rig
+answer_cache = ResponseCache(CACHE_SIZE, CACHE_TTL)
+render_health = TelemetryHealth(FPS) # In-process dashboard frame times; packet counters are per session
+
+@atexit.register
+def _release_shared_memory():
+    for session in registry.all():
+        session.close()
+
+# --- TELEMETRY DECODE (runs on the network core loop) ---
+def ingest_packet(data, addr):
+    state = registry.resolve(*addr)
+    if state is None: return
+    if len(data) < HEADER_SIZE:
+        state.health.record_malformed()
+        return
+    pid = data[5]
+    state.packet_health[pid] = time.time()
+    decode_start = time.perf_counter()
+    try:
+        decode_packet(state, pid, data)
+    except (struct.error, IndexError):
+        state.health.record_malformed() # Truncated for its packet type
+        return
+
+    state.health.record_packet(pid, data, time.perf_counter() - decode_start)
+    state.publish(time.perf_counter())
+
+def decode_packet(state, pid, data):
+    if pid == 0: # Motion
+        state.player_idx = data[20]
+        for i in range(22):
+            off = 24 + (i * 60)
+            x, _, z = struct.unpack('<fff', data[off:off+12])
+            if x != 0:
+                if i not in state.cars: 
+                    state.cars[i] = {'dist':0, 'team':-1, 'name': f"CAR {i}"}
+                state.cars[i]['x'] = x; state.cars[i]['z'] = z
+
+    elif pid == 1: # Session
+        if len(data) >= 30: state.timing.track_length = struct.unpack_from('<H', data, 28)[0]
+
+    elif pid == 2: # Lap Data
+        session_time = HEADER_TIMING.unpack_from(data, HEADER_TIMING_OFFSET)[0]
+        for i in range(22):
+            off = 24 + (i * 43)
+            last_lap_ms, lap_dist, dist = struct.unpack('<I8xff', data[off:off+20])
+            if i in state.cars:
+                state.cars[i]['dist'] = dist
+                state.cars[i]['last_lap'] = last_lap_ms / 1000.0 # 0.0 until the first lap is done
+            state.timing.update(i, lap_dist, session_time)
         
-        pad_w = draw_rect.width * 0.05
-        pad_h = draw_rect.height * 0.05
-        
-        sx = draw_rect.x + pad_w + (nx * (draw_rect.width - (pad_w*2)))
-        sy = draw_rect.y + draw_rect.height - pad_h - (nz * (draw_rect.height - (pad_h*2)))
-        return int(sx), int(sy)
-
-# --- NEW: VISION RECEIVER THREAD ---
-class VisionReceiver(threading.Thread):
-    def __init__(self):
-        super().__init__()
-        self.daemon = True
-
-    def run(self):
-        print(f"👁️ VISION: Listening on TCP {VISION_PORT}...")
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        try:
-            s.bind(("0.0.0.0", VISION_PORT))
-            s.listen(1)
-            
-            while True:
-                conn, addr = s.accept()
-                print(f"👁️ VISION: Connected to Eyes at {addr}")
-                
-                while True:
-                    try:
-                        # 1. Read Header (4 bytes = Image Size)
-                        header = conn.recv(4)
-                        if not header: break
-                        size = struct.unpack(">L", header)[0]
-
-                        # 2. Read Image Data
-                        data = b""
-                        while len(data) < size:
-                            chunk = conn.recv(4096)
-                            if not chunk: break
-                            data += chunk
-                        
-                        # 3. Store for AI
-                        if len(data) == size:
-                            state.vision_data = data # Store raw JPEG bytes
-                            
-                    except Exception as e:
-                        print(f"❌ Vision Stream Error: {e}")
-                        break
-                conn.close()
-                print("👁️ VISION: Connection Lost. Waiting...")
-
-        except Exception as e:
-            print(f"❌ Vision Server Failed to Start: {e}")
-
-# --- AI ENGINEER THREAD ---
-class RaceEngineer(threading.Thread):
-    def __init__(self):
-        super().__init__()
-        self.daemon = True
-        self.voice = RaceEngineerVoice()
+        p_off = 24 + (state.player_idx * 43)
+        state.telemetry['sector'] = data[p_off+28]
+        state.telemetry['lap_time'] = struct.unpack('<I', data[p_off+4:p_off+8])[0]
+        update_standings(state)
+
+    elif pid == 4: # Participants
+        num_cars = data[24]
+        for i in range(num_cars):
+            start_byte = 25 + (i * 56)
+            team_id = data[start_byte + 3]
+            name_bytes = data[start_byte + 7 : start_byte + 7 + 48]
+            name_str = "UNK"
+            try:
+                decoded = name_bytes.decode('utf-8', errors='ignore').split('\x00')[0]
+                if len(decoded) > 1:
+                    parts = decoded.split()
+                    name_str = parts[-1][:3].upper() if parts else decoded[:3].upper()
+            except: pass
+
+            if i in state.cars:
+                state.cars[i]['team'] = team_id
+                if name_str != "UNK": state.cars[i]['name'] = name_str
+
+    elif pid == 6: # Physics
+        p_off = 24 + (state.player_idx * 60)
+        state.telemetry['speed'] = struct.unpack('<H', data[p_off:p_off+2])[0]
+        update_standings(state)
+
+def publish_idle_sessions():
+    """Keeps readiness current for dashboards while no telemetry is flowing."""
+    now = time.perf_counter()
+    for state in registry.all():
+        if now - state.last_publish >= IDLE_PUBLISH_INTERVAL: state.publish(now)
+
+def network_tick():
+    registry.expire()
+    publish_idle_sessions()
+
+def update_standings(state):
+    active_cars = [(k, v) for k, v in state.cars.items() if v.get('dist', 0) > 1]
+    sorted_grid = sorted(active_cars, key=lambda x: x[1]['dist'], reverse=True)
+    spd_ms = max(10.0, state.telemetry['speed'] / 3.6)
+
+    standings = []
+    my_rank = 0
+    for rank, (idx, car) in enumerate(sorted_grid):
+        if idx == state.player_idx: my_rank = rank
+        gap = 0.0
+        if rank > 0:
+            ahead_idx, ahead = sorted_grid[rank-1]
+            lap = state.timing.lap_length()
+            laps_down = int((ahead['dist'] - car['dist']) // lap) if lap else 0
+            gap = state.timing.interval(idx, ahead_idx)
+            if gap is not None and laps_down:
+                # Car ahead crossed the shared boundary N laps later: add N of its laps
+                lap_time = ahead.get('last_lap', 0.0)
+                gap = gap + laps_down * lap_time if lap_time else None
+            if gap is None: # No shared minisector yet (first lap / just joined) or lap time: estimate
+                gap = (ahead['dist'] - car['dist']) / spd_ms
+        standings.append((idx, car, gap))
+
+    state.telemetry['pos'] = f"P{my_rank+1}"
+    state.telemetry['gap_ahead'] = standings[my_rank][2] if my_rank > 0 else 0.0
+    state.telemetry['gap_behind'] = standings[my_rank+1][2] if my_rank < len(standings)-1 else 0.0
+    state.standings = standings
+
+# --- VISION INTAKE ---
+def store_vision_frame(jpeg, host, rig_id):
+    state = registry.resolve(host, rig_id=rig_id)
+    if state is None: return
+    state.vision_received = time.time()
+    state.vision_data = jpeg # Store raw JPEG bytes
+    state.vision_frame += 1
+    state.vision_publisher.publish(jpeg, state.vision_received)
+
+# --- AI ENGINEER ---
+class RaceEngineer:
+    """One Whisper model + LLM client shared by every rig through fair schedulers."""
+    def __init__(self, loader):
+        self.loader = loader # Whisper arrives in the background; see ModelLoader.status
+        self.whisper_stage = FairScheduler("whisper", INFERENCE_WORKERS, MAX_PENDING_QUERIES)
+        self.llm_stage = FairScheduler("llm", INFERENCE_WORKERS, MAX_PENDING_QUERIES)
+        print("🧠 ENGINEER: Core Online. Waiting for Driver...")
+
+    @property
+    def ears(self):
+        return self.loader.ears
+
+    async def handle_utterance(self, raw_data, host, rig_id):
+        state = registry.resolve(host, rig_id=rig_id)
+        if state is None or not state.active: return
+        # Only process if we got audio
+        if len(raw_data) <= 4096: return
+        if not self.ears:
+            print(f"🧠 ENGINEER: Speech model {self.loader.status}, ignoring query")
+            return
         try:
-            print(f"🧠 LOADING WHISPER MODEL: {WHISPER_MODEL_NAME}...")
-            self.ears = WhisperModel(WHISPER_MODEL_NAME, device="cuda", compute_type="float16")
+            text = await self.whisper_stage.submit(state.rig_id, self.transcribe, raw_data)
+            if not text or len(text) < 2: return
+
+            print(f"🎤 DRIVER [{state.rig_id}]: {text}")
+            signature = telemetry_signature(state)
+            response_text = answer_cache.get(state.rig_id, text, signature)
+            if response_text:
+                c = answer_cache.snapshot()
+                print(f"   ⚡ CACHE HIT ({c['hits']}/{c['hits'] + c['misses']}, {c['saved_ms'] / 1000:.1f}s saved)")
+                state.memory.add(user_turn(state, text), response_text) # The driver heard it: keep history whole
+            else:
+                llm_start = time.perf_counter()
+                response_text = await self.llm_stage.submit(state.rig_id, self.answer, state, text)
+                if not response_text: return
+                answer_cache.put(state.rig_id, text, signature, response_text, time.perf_counter() - llm_start)
+
+            print(f"   🗣️  ENGINEER [{state.rig_id}]: {response_text}")
+            state.voice.speak(response_text)
         except Exception as e: 
-            print(f"❌ WHISPER FAILED TO LOAD: {e}")
-            self.ears = None
+            print(f"❌ Engineer Error: {e}")
+
+    def transcribe(self, raw_data):
+        wav_buf = io.BytesIO()
+        with wave.open(wav_buf, 'wb') as wf:
+            wf.setnchannels(1); wf.setsampwidth(2); wf.setframerate(16000)
+            wf.writeframes(raw_data)
+        wav_buf.seek(0)
+
+        segs, _ = self.ears.transcribe(wav_buf, beam_size=5, language="en")
+        return " ".join([x.text for x in segs]).strip()
+
+    def answer(self, state, text):
+        # --- LLM QUERY ---
+        # Fixed system prefix + rolling history + question with a trailing telemetry block
+        messages, user_content = build_messages(state.memory, state, text)
+        try:
+            response_text = llm.chat(messages)
+        except Exception:
+            self.loader.report_llm(False)
+            raise
+        self.loader.report_llm(True) # Clears a DEGRADED badge left by an offline LLM at startup
+        state.memory.add(user_content, response_text)
+
+        m = llm.last
+        print(f"   ⏱️  LLM: {m['prompt_eval_count']}/~{m['prompt_tokens_est']} prompt tokens evaluated "
+              f"in {m['prompt_eval_ms']:.0f}ms (~{m['cache_reuse_est']:.0%} cached, est.), gen {m['gen_ms']:.0f}ms")
+        return response_text
+
+def warm_llm():
+    """Loads the LLM into Ollama's memory and primes the KV cache with the system prefix."""
+    llm.chat([{'role': 'system', 'content': SYSTEM_PREFIX}, {'role': 'user', 'content': 'Radio check.'}])
+
+model_loader = ModelLoader(WHISPER_MODEL_NAME, warm_llm=warm_llm, t_start=T_START)
+
+
+# --- TELEMETRY RELAY FEED ---
+def relay_records():
+    """Latest shared-memory body of every rig that has published one."""
+    return [(s.rig_id, s.publisher.scratch) for s in registry.all() if s.publisher.published]
+
+
+# --- IN-PROCESS DASHBOARD SOURCE ---
+class LiveSource:
+    """Feeds dashboard.run_dashboard straight from the registry (non-headless mode)."""
+    def current(self): return registry.current()
+    def health(self, state):
+        snap = state.health.snapshot() if state in registry.all() else dict(state.health) # Idle StateView before any rig connects
+        snap["render"] = render_health.snapshot()["render"]
+        return snap
+    def readiness(self, state): return model_loader.status, model_loader.time_to_ready
+    def vision(self, state):
+        if not state.vision_data: return None
+        return (state.rig_id, state.vision_frame), state.vision_data, state.vision_received
+    def toggle(self, state):
+        if state in registry.all(): state.active = not state.active
+    def cycle(self): registry.cycle()
+    def rig_label(self, state):
+        rigs = registry.all()
+        return f"RIG: {state.rig_id}" + (f"  [{registry.selected % len(rigs) + 1}/{len(rigs)}] TAB" if len(rigs) > 1 else "")
 
-    def run(self):
-        print("🧠 ENGINEER: Core Online. Waiting for Driver...")
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        s.bind(("0.0.0.0", EARS_PORT))
-        s.listen(1)
-        
-        while True:
-            try:
-                conn, _ = s.accept()
-                conn.settimeout(3.0) 
-                
-                # --- READ LOOP ---
-                raw_data = b""
-                while True:
-                    try:
-                        chunk = conn.recv(4096)
-                        if not chunk: break
-                        raw_data += chunk
-                    except socket.timeout:
-                        break
-                conn.close()
-                
-                if not state.active: continue
-                
-                # Only process if we got audio
-                if len(raw_data) > 4096 and self.ears:
-                    wav_path = os.path.join(BASE_DIR, "cmd.wav")
-                    with wave.open(wav_path, 'wb') as wf:
-                        wf.setnchannels(1); wf.setsampwidth(2); wf.setframerate(16000)
-                        wf.writeframes(raw_data)
-                    
-                    # Transcribe
-                    segs, _ = self.ears.transcribe(wav_path, beam_size=5, language="en")
-                    text = " ".join([x.text for x in segs]).strip()
-                    
-                    if len(text) < 2: continue
-
-                    print(f"🎤 DRIVER: {text}")
-                    
-                    # --- LLM QUERY ---
-                    t = state.telemetry
-                    
-                    if t['gap_ahead'] == 0.0: gap_a = "Clear Air"
-                    else: gap_a = f"{t['gap_ahead']:.2f}s"
-                    
-                    # --- CHECK VISION DATA ---
-                    vision_context = "No visual data available."
-                    if state.vision_data:
-                         vision_context = "Visual feed is active (Simulating: Track looks dry)."
-
-                    prompt = (
-                        f"You are a F1 Race Engineer. Driver asked: '{text}'. "
-                        f"Telemetry: [Position: {t['pos']}, Gap Ahead: {gap_a}, Gap Behind: {t['gap_behind']:.2f}s, Speed: {t['speed']} KPH]. "
-                        f"Vision: {vision_context}. "
-                        f"Instruction: Answer the driver using the telemetry. Be ultra concise. Max 10 words. "
-                        f"Do not say 'Copy that'."
-                    )
-                    
-                    res = ollama.chat(model=OLLAMA_MODEL_NAME, messages=[{'role':'user', 'content':prompt}])
-                    response_text = res['message']['content']
-                    
-                    print(f"   🗣️  ENGINEER: {response_text}")
-                    self.voice.speak(response_text)
-
-            except Exception as e: 
-                print(f"❌ Engineer Error: {e}")
-                time.sleep(0.1)
-
-
-# --- MAIN GUI ---
 def main():
-    # 1. Start Audio Engineer
-    eng = RaceEngineer()
-    eng.start()
-
-    # 2. Start Vision Receiver (NEW)
-    vis = VisionReceiver()
-    vis.start()
-
-    pygame.init()
-    screen = pygame.display.set_mode(DEFAULT_RES, pygame.RESIZABLE)
-    pygame.display.set_caption("F1 NEURAL COPILOT v1.0")
-    clock = pygame.time.Clock()
-    
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", UDP_PORT))
-    sock.setblocking(False)
-
-    track_logic = SmartTrackMap()
-
-    print(f"✅ DASHBOARD: Listening on UDP {UDP_PORT}")
-
-    # --- SAFETY INIT ---
-    sorted_grid = []
-    spd_ms = 1.0
-
-    running = True
-    while running:
-        # --- DYNAMIC RESIZING ---
-        W, H = screen.get_size()
-        RECT_GRID = pygame.Rect(int(W * 0.02), int(H * 0.12), int(W * 0.25), int(H * 0.85))
-        RECT_MAP = pygame.Rect(int(W * 0.29), int(H * 0.12), int(W * 0.69), int(H * 0.85))
-        
-        F_SMALL = pygame.font.SysFont("Consolas", int(H * 0.015))
-        F_MED = pygame.font.SysFont("Consolas", int(H * 0.022), bold=True)
-        F_LARGE = pygame.font.SysFont("Consolas", int(H * 0.05), bold=True)
-
-        # INPUT
-        mouse_pos = pygame.mouse.get_pos()
-        click = False
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT: running = False
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1: click = True
-        
-        btn_eng = pygame.Rect(int(W * 0.02), int(H * 0.02), int(W * 0.15), int(H * 0.06))
-        if click and btn_eng.collidepoint(mouse_pos):
-            state.active = not state.active
-
-        # DATA INGESTION
+    parser = argparse.ArgumentParser(description="F1 Neural Copilot Brain")
+    parser.add_argument("--headless", action="store_true",
+                        help="No window: ingestion + engineer only. Attach with 'python src/dashboard.py --rig <id>'")
+    args = parser.parse_args()
+
+    # 1. Load Audio Engineer (models load in the background, dashboard opens right away)
+    model_loader.start()
+    eng = RaceEngineer(model_loader)
+
+    # 2. Start Network Core (telemetry + ears + vision + relay on one event loop)
+    relay = None
+    if RELAY.get("port"):
+        relay = TelemetryRelay(relay_records,
+                               RELAY["port"], RELAY.get("max_hz", 60), RELAY.get("keyframe_interval", 30),
+                               RELAY.get("multicast_group") or None, RELAY.get("multicast_port"),
+                               RELAY.get("multicast_hz", 10))
+    net = NetworkCore(UDP_PORT, EARS_PORT, VISION_PORT,
+                      on_packet=ingest_packet,
+                      on_utterance=eng.handle_utterance,
+                      on_frame=store_vision_frame,
+                      relay=relay,
+                      on_tick=network_tick,
+                      tick_interval=IDLE_PUBLISH_INTERVAL)
+    net.start()
+    if not net.ready.wait(5.0) or net.error:
+        print("❌ CRITICAL: Network core did not start (port in use?). Exiting.")
+        sys.exit(1)
+
+    # 3. Pre-register configured rigs so the dashboard can cycle to them (TAB)
+    for alias in RIG_ALIASES:
+        host, _, port = alias.partition(":")
+        registry.resolve(host, port or None)
+
+    # 4. Dashboard in-process, or nothing and let separate dashboards attach
+    if args.headless:
+        print("🛰️  HEADLESS: Publishing state to shared memory. Ctrl+C to stop.")
         try:
-            while True:
-                data, _ = sock.recvfrom(2048)
-                if len(data) < 24: continue
-                pid = data[5]
-                state.packet_health[pid] = time.time()
-
-                if pid == 0: # Motion
-                    state.player_idx = data[20]
-                    for i in range(22):
-                        off = 24 + (i * 60)
-                        x, _, z = struct.unpack('<fff', data[off:off+12])
-                        if x != 0:
-                            if i not in state.cars: 
-                                state.cars[i] = {'dist':0, 'team':-1, 'name': f"CAR {i}"}
-                            state.cars[i]['x'] = x; state.cars[i]['z'] = z
-                            if i == state.player_idx:
-                                track_logic.add_point(x, z, state.telemetry['sector'])
-
-                elif pid == 2: # Lap Data
-                    for i in range(22):
-                        off = 24 + (i * 43)
-                        dist = struct.unpack('<f', data[off+16:off+20])[0]
-                        if i in state.cars: state.cars[i]['dist'] = dist
-                    
-                    p_off = 24 + (state.player_idx * 43)
-                    state.telemetry['sector'] = data[p_off+28]
-                    state.telemetry['lap_time'] = struct.unpack('<I', data[p_off+4:p_off+8])[0]
-
-                elif pid == 4: # Participants
-                    num_cars = data[24]
-                    for i in range(num_cars):
-                        start_byte = 25 + (i * 56)
-                        team_id = data[start_byte + 3]
-                        name_bytes = data[start_byte + 7 : start_byte + 7 + 48]
-                        name_str = "UNK"
-                        try:
-                            decoded = name_bytes.decode('utf-8', errors='ignore').split('\x00')[0]
-                            if len(decoded) > 1:
-                                parts = decoded.split()
-                                name_str = parts[-1][:3].upper() if parts else decoded[:3].upper()
-                        except: pass
-
-                        if i in state.cars:
-                            state.cars[i]['team'] = team_id
-                            if name_str != "UNK": state.cars[i]['name'] = name_str
-
-                elif pid == 6: # Physics
-                    p_off = 24 + (state.player_idx * 60)
-                    state.telemetry['speed'] = struct.unpack('<H', data[p_off:p_off+2])[0]
-
-        except BlockingIOError: pass
-
-        # --- LOGIC ---
-        active_cars = {k: v for k, v in state.cars.items() if v.get('dist', 0) > 1}
-        sorted_grid = sorted(active_cars.items(), key=lambda x: x[1]['dist'], reverse=True)
-        
-        my_rank = 0
-        for rank, (idx, car) in enumerate(sorted_grid):
-            if idx == state.player_idx: my_rank = rank; break
-        
-        state.telemetry['pos'] = f"P{my_rank+1}"
-        spd_ms = max(10.0, state.telemetry['speed'] / 3.6)
-        
-        if my_rank > 0:
-            ahead_idx = sorted_grid[my_rank-1][0]
-            delta = state.cars[ahead_idx]['dist'] - state.cars[state.player_idx]['dist']
-            state.telemetry['gap_ahead'] = delta / spd_ms
-        else: state.telemetry['gap_ahead'] = 0.0
-
-        if my_rank < len(sorted_grid)-1:
-            behind_idx = sorted_grid[my_rank+1][0]
-            delta = state.cars[state.player_idx]['dist'] - state.cars[behind_idx]['dist']
-            state.telemetry['gap_behind'] = delta / spd_ms
-        else: state.telemetry['gap_behind'] = 0.0
-
-        # RENDER
-        screen.fill(BLACK)
-
-        col = GREEN if state.active else RED
-        pygame.draw.rect(screen, col, btn_eng, border_radius=8)
-        eng_txt = F_MED.render(f"COPILOT: {'ON' if state.active else 'OFF'}", True, BLACK)
-        screen.blit(eng_txt, (btn_eng.centerx - eng_txt.get_width()//2, btn_eng.centery - eng_txt.get_height()//2))
-
-        # Show Vision Status on Screen
-        vis_col = GREEN if state.vision_data else RED
-        pygame.draw.circle(screen, vis_col, (W - 30, H - 30), 10)
-        
-        sec = state.telemetry['lap_time'] / 1000.0
-        m, s = int(sec // 60), sec % 60
-        t_str = f"LAP: {m}:{s:05.2f}"
-        time_lbl = F_LARGE.render(t_str, True, WHITE)
-        screen.blit(time_lbl, (W - time_lbl.get_width() - 40, int(H * 0.02)))
-
-        # GRID PANEL
-        pygame.draw.rect(screen, DARK_BG, RECT_GRID)
-        grid_title = F_MED.render("LIVE STANDINGS", True, CYAN)
-        screen.blit(grid_title, (RECT_GRID.x + 20, RECT_GRID.y + 10))
-        
-        y_offset = RECT_GRID.y + 50
-        row_h = int(RECT_GRID.height / 22)
-        rank = 1
-        
-        for idx, car in sorted_grid:
-            tid = car.get('team', -1)
-            t_col = TEAMS.get(tid, GRAY_DEFAULT)
-            is_player = (idx == state.player_idx)
-            
-            gap_txt = "Leader" if rank == 1 else ""
-            if rank > 1:
-                if rank-2 >= 0 and rank-2 < len(sorted_grid):
-                    d_delta = sorted_grid[rank-2][1]['dist'] - car['dist']
-                    t_gap = d_delta / spd_ms
-                    gap_txt = f"+{t_gap:.2f}s"
-
-            bg_col = (40, 40, 60) if is_player else DARK_BG
-            r_rect = pygame.Rect(RECT_GRID.x + 10, y_offset, RECT_GRID.width - 20, row_h - 4)
-            pygame.draw.rect(screen, bg_col, r_rect)
-            pygame.draw.rect(screen, t_col, (r_rect.x + 5, r_rect.y + 5, 5, r_rect.height - 10))
-            
-            name = car.get('name', f"CAR {idx}")
-            row_txt = f"P{rank:02d} {name:<4} {gap_txt}"
-            txt_surf = F_SMALL.render(row_txt, True, WHITE if not is_player else CYAN)
-            screen.blit(txt_surf, (r_rect.x + 20, r_rect.centery - txt_surf.get_height()//2))
-
-            y_offset += row_h
-            rank += 1
-            if y_offset > RECT_GRID.bottom: break
-
-        # MAP PANEL
-        pygame.draw.rect(screen, (20, 20, 25), RECT_MAP, 2)
-        
-        if len(track_logic.points) > 2:
-            pts = track_logic.points
-            step = 1 if len(pts) < 1000 else 2
-            for i in range(0, len(pts)-step, step):
-                p1 = track_logic.to_screen(pts[i][0], pts[i][1], RECT_MAP)
-                p2 = track_logic.to_screen(pts[i+step][0], pts[i+step][1], RECT_MAP)
-                if pts[i][2] != pts[i+step][2]: pygame.draw.circle(screen, WHITE, p1, 3)
-                pygame.draw.line(screen, WHITE, p1, p2, 2)
-
-        for idx, car in state.cars.items():
-            if 'x' in car:
-                sx, sy = track_logic.to_screen(car['x'], car['z'], RECT_MAP)
-                tid = car.get('team', -1)
-                t_col = TEAMS.get(tid, GRAY_DEFAULT)
-                
-                if idx == state.player_idx:
-                    pygame.draw.circle(screen, WHITE, (sx, sy), 8, 2)
-                    pygame.draw.circle(screen, CYAN, (sx, sy), 5)
-                else:
-                    pygame.draw.rect(screen, t_col, (sx-3, sy-3, 6, 6))
-                    if 'name' in car:
-                        lbl = F_SMALL.render(car['name'], True, t_col)
-                        screen.blit(lbl, (sx, sy-15))
-
-        pygame.display.flip()
-        clock.tick(FPS)
+            while net.is_alive(): net.join(1.0)
+        except KeyboardInterrupt:
+            print("\n🛑 Shutdown.")
+    else:
+        from dashboard import run_dashboard
+        run_dashboard(LiveSource(), t_start=T_START, render_health=render_health)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
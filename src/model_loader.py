@@ -0,0 +1,119 @@
+import io
+import threading
+import time
+import wave
+
+# --- READINESS STATES ---
+LOADING, WARMING, READY, DEGRADED = "loading", "warming", "ready", "degraded"
+STATUSES = (LOADING, WARMING, READY, DEGRADED)
+
+# Tried in order; the CPU int8 model keeps the Brain usable without a GPU
+WHISPER_BACKENDS = (("cuda", "float16"), ("cpu", "int8"))
+
+LLM_RETRY_INTERVAL = 15.0  # Seconds between warm-up retries while the LLM is offline
+LLM_OFFLINE = "LLM offline"
+
+
+def silence_wav(seconds=1.0, rate=16000):
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wf:
+        wf.setnchannels(1); wf.setsampwidth(2); wf.setframerate(rate)
+        wf.writeframes(b"\x00\x00" * int(seconds * rate))
+    buf.seek(0)
+    return buf
+
+
+# --- BACKGROUND MODEL LOADER ---
+class ModelLoader(threading.Thread):
+    """Loads + warms Whisper (and pings the LLM) without blocking the dashboard.
+
+    status walks loading -> warming -> ready, or ends in degraded when it had to
+    fall back to CPU, the LLM is offline, or no Whisper backend loaded and
+    warmed up. A backend only counts once its warm-up transcription succeeded:
+    missing CUDA libraries often only fail there. An offline LLM is retried in
+    the background, and report_llm() lets real queries update the badge too.
+    """
+    def __init__(self, whisper_name, warm_llm=None, t_start=None):
+        super().__init__()
+        self.daemon = True
+        self.whisper_name = whisper_name
+        self.warm_llm = warm_llm
+        self.t_start = t_start if t_start is not None else time.perf_counter()
+        self.status = LOADING
+        self.detail = ""
+        self.problems = []
+        self.device = None
+        self.ears = None
+        self.time_to_ready = None
+        self.lock = threading.Lock()
+
+    def run(self):
+        print(f"🧠 LOADING WHISPER MODEL: {self.whisper_name} (background)...")
+        try:
+            from faster_whisper import WhisperModel
+            for device, compute_type in WHISPER_BACKENDS:
+                self.status = LOADING
+                try:
+                    ears = WhisperModel(self.whisper_name, device=device, compute_type=compute_type)
+                except Exception as e:
+                    print(f"⚠️ WHISPER ({device}/{compute_type}) FAILED TO LOAD: {e}")
+                    continue
+                # --- WARM-UP: first real query should not pay for kernel/cache init ---
+                self.status = WARMING
+                try:
+                    segs, _ = ears.transcribe(silence_wav(), beam_size=5, language="en")
+                    list(segs)  # Segments are lazy; decoding only happens on iteration
+                except Exception as e:
+                    print(f"⚠️ WHISPER ({device}/{compute_type}) WARM-UP FAILED: {e}")
+                    continue
+                self.ears = ears
+                self.device = f"{device}/{compute_type}"
+                break
+            if self.device and not self.device.startswith("cuda"): self.problems.append("CPU fallback")
+        except ImportError as e:
+            print(f"❌ WHISPER UNAVAILABLE: {e}")
+
+        if self.ears is None:
+            self.problems.append("no speech model")
+            self._finish()
+            return
+
+        self.status = WARMING
+        llm_ok = self._try_llm()
+        self._finish()
+        while not llm_ok:
+            time.sleep(LLM_RETRY_INTERVAL)
+            llm_ok = self._try_llm()
+
+    def _try_llm(self):
+        if not self.warm_llm: return True
+        try:
+            self.warm_llm()
+        except Exception as e:
+            print(f"⚠️ LLM WARM-UP FAILED: {e}")
+            self.report_llm(False)
+            return False
+        self.report_llm(True)
+        return True
+
+    def report_llm(self, ok):
+        """Called after every LLM call so the badge follows Ollama going away and coming back."""
+        with self.lock:
+            if ok == (LLM_OFFLINE not in self.problems): return
+            if ok: self.problems.remove(LLM_OFFLINE)
+            else: self.problems.append(LLM_OFFLINE)
+            if self.time_to_ready is None: return  # Still starting up: _finish() reports
+            self._set_status()
+        print(f"{'✅' if ok else '⚠️'} ENGINEER: LLM {'back online' if ok else 'offline'}, now {self.status.upper()}")
+
+    def _set_status(self):
+        self.detail = ", ".join(self.problems)
+        self.status = DEGRADED if self.problems else READY
+
+    def _finish(self):
+        with self.lock:
+            self.time_to_ready = time.perf_counter() - self.t_start
+            self._set_status()
+        icon = "✅" if self.status == READY else "⚠️"
+        print(f"{icon} ENGINEER: {self.status.upper()} in {self.time_to_ready:.1f}s"
+              f"{f' ({self.detail})' if self.detail else ''} [whisper: {self.device or 'none'}]")
@@ -0,0 +1,264 @@
+import asyncio
+import struct
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+VISION_HEADER = struct.Struct(">L")       # 4 bytes = JPEG size (see vision_sender.py)
+MAX_VISION_FRAME = 8 * 1024 * 1024
+AUDIO_IDLE_TIMEOUT = 3.0                  # PTT released but socket left open
+MAX_UTTERANCE_BYTES = 16000 * 2 * 30      # 30s of 16kHz mono int16
+
+HANDSHAKE_PREFIX = b"RIG:"                 # Optional b"RIG:<id>\n" sent first on TCP links
+MAX_HANDSHAKE = 64
+
+_background_tasks = set()  # Strong refs so pending utterance tasks are not garbage collected
+
+
+# --- RIG HANDSHAKE ---
+def parse_handshake(buffer):
+    """Strips an optional b"RIG:<id>\\n" preamble from the front of buffer.
+
+    Returns (done, rig_id). done is False while more bytes are needed to decide.
+    """
+    if len(buffer) < len(HANDSHAKE_PREFIX):
+        return (not HANDSHAKE_PREFIX.startswith(bytes(buffer)), None)
+    if not buffer.startswith(HANDSHAKE_PREFIX): return True, None
+    end = buffer.find(b"\n")
+    if end < 0:
+        return len(buffer) > MAX_HANDSHAKE, None
+    rig_id = buffer[len(HANDSHAKE_PREFIX):end].decode('utf-8', errors='ignore').strip()
+    del buffer[:end + 1]
+    return True, rig_id or None
+
+
+# --- FAIR SCHEDULER ---
+class FairScheduler:
+    """Shares one blocking backend (Whisper, LLM) between every rig.
+
+    Jobs queue per rig and each free worker takes the next job round-robin
+    across rigs, so a rig waits for at most one job from each other rig.
+    `max_pending` bounds each rig's running + queued jobs, so one chatty rig
+    sheds its own load instead of delaying everyone else.
+    """
+    def __init__(self, name, workers=1, max_pending=2):
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queues = {}      # rig_id -> deque of (fn, args, future)
+        self.in_flight = {}   # rig_id -> jobs handed to the executor
+        self.rotation = deque()
+        self.busy = 0
+        self.completed = 0
+        self.dropped = 0
+
+    def pending(self, rig_id):
+        return len(self.queues.get(rig_id, ())) + self.in_flight.get(rig_id, 0)
+
+    async def submit(self, rig_id, fn, *args):
+        """Returns fn(*args), or None if this rig already has max_pending jobs."""
+        if self.pending(rig_id) >= self.max_pending:
+            self.dropped += 1
+            print(f"⏳ {self.name.upper()}: {rig_id} busy ({self.pending(rig_id)} pending), dropping request")
+            return None
+        if rig_id not in self.queues:
+            self.queues[rig_id] = deque()
+            self.rotation.append(rig_id)
+        future = asyncio.get_running_loop().create_future()
+        self.queues[rig_id].append((fn, args, future))
+        self._dispatch()
+        return await future
+
+    def _next_job(self):
+        for _ in range(len(self.rotation)):
+            rig_id = self.rotation[0]
+            self.rotation.rotate(-1)
+            if self.queues[rig_id]:
+                return (rig_id,) + self.queues[rig_id].popleft()
+        return None
+
+    def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while self.busy < self.workers:
+            job = self._next_job()
+            if job is None: return
+            rig_id, fn, args, future = job
+            self.busy += 1
+            self.in_flight[rig_id] = self.in_flight.get(rig_id, 0) + 1
+            work = loop.run_in_executor(self.executor, fn, *args)
+            work.add_done_callback(lambda w, r=rig_id, f=future: self._job_done(r, f, w))
+
+    def _job_done(self, rig_id, future, work):
+        self.busy -= 1
+        self.in_flight[rig_id] -= 1
+        self.completed += 1
+        if not future.cancelled():
+            if work.exception(): future.set_exception(work.exception())
+            else: future.set_result(work.result())
+        self._dispatch()
+
+
+# --- PROTOCOLS ---
+class TelemetryProtocol(asyncio.DatagramProtocol):
+    def __init__(self, on_packet):
+        self.on_packet = on_packet
+
+    def datagram_received(self, data, addr):
+        try:
+            self.on_packet(data, addr)
+        except Exception as e:
+            print(f"❌ Telemetry Decode Error: {e}")
+
+
+class VisionProtocol(asyncio.Protocol):
+    """Length-prefixed JPEG frames. One instance per connected Eyes client."""
+    def __init__(self, on_frame):
+        self.on_frame = on_frame
+        self.buffer = bytearray()
+        self.transport = None
+        self.host = None
+        self.rig_id = None
+        self.handshake_done = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.host = transport.get_extra_info('peername')[0]
+        print(f"👁️ VISION: Connected to Eyes at {transport.get_extra_info('peername')}")
+
+    def data_received(self, data):
+        self.buffer += data
+        if not self.handshake_done:
+            self.handshake_done, self.rig_id = parse_handshake(self.buffer)
+            if not self.handshake_done: return
+        while len(self.buffer) >= VISION_HEADER.size:
+            size = VISION_HEADER.unpack_from(self.buffer)[0]
+            if size > MAX_VISION_FRAME:
+                print(f"❌ Vision Stream Error: frame of {size} bytes, dropping client")
+                self.transport.close()
+                return
+            end = VISION_HEADER.size + size
+            if len(self.buffer) < end: break
+            frame = bytes(self.buffer[VISION_HEADER.size:end])
+            del self.buffer[:end]
+            self.on_frame(frame, self.host, self.rig_id)
+
+    def connection_lost(self, exc):
+        print("👁️ VISION: Connection Lost. Waiting...")
+
+
+class AudioProtocol(asyncio.Protocol):
+    """One connection = one utterance, framed by EOF or an idle timeout."""
+    def __init__(self, on_utterance):
+        self.on_utterance = on_utterance
+        self.buffer = bytearray()
+        self.transport = None
+        self.idle_handle = None
+        self.done = False
+        self.host = None
+        self.rig_id = None
+        self.handshake_done = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.host = transport.get_extra_info('peername')[0]
+        self._arm_timeout()
+
+    def data_received(self, data):
+        self.buffer += data
+        if not self.handshake_done:
+            self.handshake_done, self.rig_id = parse_handshake(self.buffer)
+        if len(self.buffer) >= MAX_UTTERANCE_BYTES:
+            self._finish()
+        else:
+            self._arm_timeout()
+
+    def eof_received(self):
+        self._finish()
+
+    def connection_lost(self, exc):
+        self._finish()
+
+    def _arm_timeout(self):
+        if self.idle_handle: self.idle_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self.idle_handle = loop.call_later(AUDIO_IDLE_TIMEOUT, self._finish)
+
+    def _finish(self):
+        if self.done: return
+        self.done = True
+        if self.idle_handle: self.idle_handle.cancel()
+        self.transport.close()
+        task = asyncio.get_running_loop().create_task(self.on_utterance(bytes(self.buffer), self.host, self.rig_id))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+# --- EVENT LOOP OWNER ---
+class NetworkCore(threading.Thread):
+    """Single asyncio loop owning the telemetry, ears and vision sockets.
+
+    `on_packet(data, addr)` and `on_frame(jpeg, host, rig_id)` run on the loop and
+    must be cheap; `on_utterance(raw, host, rig_id)` is a coroutine and offloads its
+    heavy work to a FairScheduler. rig_id is None unless the client sent a handshake.
+    `on_tick()` runs on the loop every `tick_interval` seconds, traffic or not.
+    """
+    def __init__(self, udp_port, ears_port, vision_port, on_packet, on_utterance, on_frame, relay=None,
+                 on_tick=None, tick_interval=0.25):
+        super().__init__()
+        self.daemon = True
+        self.udp_port = udp_port
+        self.ears_port = ears_port
+        self.vision_port = vision_port
+        self.on_packet = on_packet
+        self.on_utterance = on_utterance
+        self.on_frame = on_frame
+        self.relay = relay # Optional TelemetryRelay sharing this loop
+        self.on_tick = on_tick
+        self.tick_interval = tick_interval
+        self.loop = None
+        self.ready = threading.Event()
+        self.error = None # Set (before ready) if a socket could not be opened
+
+    def run(self):
+        if HAS_UVLOOP:
+            self.loop = uvloop.new_event_loop()
+        else:
+            self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            print(f"❌ Network Core Failed to Start: {e}")
+            self.error = e
+            self.ready.set()
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        await loop.create_datagram_endpoint(
+            lambda: TelemetryProtocol(self.on_packet), local_addr=("0.0.0.0", self.udp_port))
+        await loop.create_server(
+            lambda: AudioProtocol(self.on_utterance), "0.0.0.0", self.ears_port, reuse_address=True)
+        await loop.create_server(
+            lambda: VisionProtocol(self.on_frame), "0.0.0.0", self.vision_port, reuse_address=True)
+        if self.relay:
+            await self.relay.start(loop)
+        if self.on_tick:
+            loop.create_task(self._tick_loop())
+
+        print(f"🌐 NETWORK: UDP {self.udp_port} | EARS TCP {self.ears_port} | VISION TCP {self.vision_port}"
+              f"{' (uvloop)' if HAS_UVLOOP else ''}")
+        self.ready.set()
+        await asyncio.Event().wait()
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            try: self.on_tick()
+            except Exception as e: print(f"❌ Tick Error: {e}")
@@ -0,0 +1,68 @@
+from collections import deque
+
+# --- FIXED SYSTEM PREFIX ---
+# Byte-identical on every call so Ollama can reuse the KV cache for it.
+# Anything that changes per query belongs in the trailing telemetry block.
+SYSTEM_PREFIX = (
+    "You are an F1 race engineer talking to your driver over team radio.\n"
+    "Every driver message ends with a TELEMETRY line:\n"
+    "POS = race position, AHEAD / BEHIND = time gap to the car ahead / behind "
+    "(CLEAR = nobody there), SPEED = KPH, VISION = track condition from the camera feed "
+    "(N/A = no feed).\n"
+    "Answer the driver using the telemetry. Be ultra concise. Max 10 words. "
+    "Do not say 'Copy that'."
+)
+
+CHARS_PER_TOKEN = 4  # Rough English/Llama ratio; only used for budgeting
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def telemetry_block(state):
+    """Compact, fixed-layout trailing block: same fields, same widths, every call."""
+    t = state.telemetry
+    ahead = "CLEAR  " if t['gap_ahead'] == 0.0 else f"{t['gap_ahead']:+06.2f}s"
+    behind = "CLEAR  " if t['gap_behind'] == 0.0 else f"{t['gap_behind']:+06.2f}s"
+    vision = "DRY" if state.vision_data else "N/A"
+    return (f"TELEMETRY|POS:{t['pos']:>4}|AHEAD:{ahead}|BEHIND:{behind}"
+            f"|SPEED:{t['speed']:>3}|VISION:{vision}")
+
+
+# --- ROLLING CONVERSATION MEMORY ---
+class ConversationMemory:
+    """Last few exchanges, bounded by turn count and an estimated token budget.
+
+    User turns are stored exactly as sent (telemetry included) so the next
+    prompt starts with the previous one byte-for-byte.
+    """
+    def __init__(self, max_turns=6, token_budget=600):
+        self.turns = deque(maxlen=max_turns)
+        self.token_budget = token_budget
+
+    def add(self, user_content, reply):
+        self.turns.append((user_content, reply, estimate_tokens(user_content) + estimate_tokens(reply)))
+        while self.turns and sum(t[2] for t in self.turns) > self.token_budget:
+            self.turns.popleft()
+
+    def messages(self):
+        out = []
+        for user_content, reply, _ in self.turns:
+            out.append({'role': 'user', 'content': user_content})
+            out.append({'role': 'assistant', 'content': reply})
+        return out
+
+
+def user_turn(state, text):
+    """The driver's question as stored in history: text, then the telemetry line."""
+    return f"{text}\n{telemetry_block(state)}"
+
+
+def build_messages(memory, state, text):
+    """Returns (messages, user_content): fixed prefix, history, then question + telemetry."""
+    user_content = user_turn(state, text)
+    messages = [{'role': 'system', 'content': SYSTEM_PREFIX}]
+    messages += memory.messages()
+    messages.append({'role': 'user', 'content': user_content})
+    return messages, user_content
@@ -14,6 +14,7 @@ try:
     RX_PORT = C["network"]["voice_target_port"] # 6666
     TX_PORT = C["network"]["ears_port"]         # 7777
     MIC_IDX = C.get("audio", {}).get("mic_index", 1)
+    RIG_ID = C["network"].get("rig_id", "") # Sent as b"RIG:<id>\n" so a shared Brain can tell rigs apart
 except Exception as e:
     print(f"⚠️ Config Error: {e}")
     sys.exit(1)
@@ -85,6 +86,7 @@ class Headset:
                     try:
                         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                         s.settimeout(0.5); s.connect((BRAIN_IP, TX_PORT))
+                        if RIG_ID: s.sendall(f"RIG:{RIG_ID}\n".encode())
                         with self.lock: self.tx_socket = s
                         self.talking = True
                     except: pass 
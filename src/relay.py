@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import socket
+import struct
+import time
+
+from state_shm import BODY_SIZE, LAYOUT_VERSION, unpack_state
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+# --- WIRE FORMAT ---
+# Each datagram = FRAME header + payload. The record is the same fixed layout as
+# the shared-memory block (state_shm), padded to whole 32-bit words.
+#   KEY:   payload = full record
+#   DELTA: payload = bitmap of changed words (1 bit per word) + the changed words,
+#          relative to the frame numbered base_seq
+# Unchanged frames still go out as (tiny) deltas: they double as a heartbeat and
+# keep the keyframe cadence for multicast listeners that join late.
+MAGIC = b"F1RL"
+KEY, DELTA = 0, 1
+FRAME = struct.Struct('<4sBB16sII')       # magic, layout version, kind, rig_id, seq, base_seq
+WORD = 4
+RECORD_SIZE = (BODY_SIZE + WORD - 1) // WORD * WORD
+N_WORDS = RECORD_SIZE // WORD
+BITMAP_SIZE = (N_WORDS + 7) // 8
+
+SUB_TTL = 10.0                            # Subscriptions expire unless renewed
+RENEW_INTERVAL = 3.0
+NONCE_PREFIX = b"NONCE "                  # Relay -> would-be subscriber: echo this back in SUB
+SUB_PAD = 32                              # Clients pad SUB so a NONCE reply is never larger
+
+
+def pad_record(body):
+    return bytes(body) + b"\x00" * (RECORD_SIZE - len(body))
+
+
+def encode_delta(prev, cur):
+    if HAS_NUMPY:
+        a = np.frombuffer(prev, dtype='<u4'); b = np.frombuffer(cur, dtype='<u4')
+        changed = a != b
+        return np.packbits(changed, bitorder='little').tobytes() + b[changed].tobytes()
+    bitmap = bytearray(BITMAP_SIZE)
+    words = bytearray()
+    for i in range(0, RECORD_SIZE, WORD):
+        if prev[i:i+WORD] != cur[i:i+WORD]:
+            w = i // WORD
+            bitmap[w >> 3] |= 1 << (w & 7)
+            words += cur[i:i+WORD]
+    return bytes(bitmap) + bytes(words)
+
+
+def apply_delta(prev, payload):
+    bitmap, words = payload[:BITMAP_SIZE], payload[BITMAP_SIZE:]
+    if len(bitmap) < BITMAP_SIZE or len(words) != WORD * sum(bin(b).count("1") for b in bitmap):
+        raise ValueError("malformed delta")
+    out = bytearray(prev)
+    j = 0
+    for w in range(N_WORDS):
+        if bitmap[w >> 3] & (1 << (w & 7)):
+            out[w*WORD:(w+1)*WORD] = words[j:j+WORD]
+            j += WORD
+    return bytes(out)
+
+
+# --- PER-SUBSCRIBER STREAM STATE ---
+class Stream:
+    """What one destination last received for one rig: the base for its next delta."""
+    def __init__(self, interval):
+        self.interval = interval
+        self.next_due = 0.0
+        self.last_record = None
+        self.last_seq = 0
+        self.since_key = 0
+        self.force_key = True
+
+
+# --- RELAY (runs on the network core loop) ---
+class TelemetryRelay(asyncio.DatagramProtocol):
+    """Republishes decoded rig state to secondary consumers.
+
+    Unicast: a consumer sends b"SUB <rig_id|*> <max_hz>" to the relay port and
+    gets b"NONCE <hex>" back. Only a SUB that echoes it, b"SUB <rig_id|*> <max_hz> <hex>",
+    starts a stream (capped at max_hz, renewed every few seconds), so a spoofed
+    source address never gets one. The reply is no larger than the SUB it answers.
+    b"KEY <rig_id>" asks for a keyframe after a lost delta, b"BYE" unsubscribes.
+    Multicast: every rig is also sent to `multicast_group`:`multicast_port` at `multicast_hz`.
+    `records()` returns [(rig_id, body_bytes)] for every rig that has published.
+    """
+    def __init__(self, records, port, max_hz=60, keyframe_interval=30,
+                 multicast_group=None, multicast_port=None, multicast_hz=10):
+        self.records = records
+        self.port = port
+        self.max_hz = max_hz
+        self.keyframe_interval = keyframe_interval
+        self.multicast_group = multicast_group
+        self.multicast_port = multicast_port or port + 1
+        self.multicast_hz = multicast_hz
+        self.transport = None
+        self.subscribers = {}   # addr -> (rig filter, max_hz, expires)
+        self.streams = {}       # (addr, rig_id) -> Stream
+        self.seq = {}           # rig_id -> frame counter
+        self.mcast_sock = None
+        self.frames_sent = 0
+        self.bytes_sent = 0
+        self.keyframes_sent = 0
+        self.secret = os.urandom(16)   # Nonces are derived from it: no per-address state before the echo
+
+    async def start(self, loop):
+        await loop.create_datagram_endpoint(lambda: self, local_addr=("0.0.0.0", self.port))
+        if self.multicast_group:
+            self.mcast_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.mcast_sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+            self.mcast_sock.setblocking(False)
+        loop.create_task(self._tick_loop())
+        print(f"📡 RELAY: UDP {self.port}"
+              f"{f' + multicast {self.multicast_group}:{self.multicast_port} @ {self.multicast_hz}Hz' if self.multicast_group else ''}")
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        parts = data.decode('utf-8', errors='ignore').split()
+        if not parts: return
+        cmd = parts[0].upper()
+        if cmd == "SUB":
+            nonce = self._nonce(addr)
+            if len(parts) < 4 or not hmac.compare_digest(parts[3].encode(), nonce):
+                # Return routability check: only the real owner of addr sees the nonce
+                reply = NONCE_PREFIX + nonce
+                if len(data) >= len(reply): self.transport.sendto(reply, addr)
+                return
+            rig = parts[1] if len(parts) > 1 else "*"
+            try: hz = min(self.max_hz, max(0.1, float(parts[2]))) if len(parts) > 2 else self.max_hz
+            except ValueError: hz = self.max_hz
+            if addr not in self.subscribers: print(f"📡 RELAY: {addr} subscribed to {rig} @ {hz:g}Hz")
+            self.subscribers[addr] = (rig, hz, time.monotonic() + SUB_TTL)
+            for (a, _), stream in self.streams.items():
+                if a == addr: stream.interval = 1.0 / hz
+        elif cmd == "KEY":
+            for (a, rig_id), stream in self.streams.items():
+                if a == addr and (len(parts) < 2 or parts[1] == rig_id): stream.force_key = True
+        elif cmd == "BYE":
+            self._drop(addr)
+
+    def _nonce(self, addr):
+        return hmac.new(self.secret, f"{addr[0]}:{addr[1]}".encode(), hashlib.sha256).hexdigest()[:16].encode()
+
+    def _drop(self, addr):
+        self.subscribers.pop(addr, None)
+        for key in [k for k in self.streams if k[0] == addr]: del self.streams[key]
+
+    async def _tick_loop(self):
+        while True:
+            await asyncio.sleep(1.0 / self.max_hz)
+            try: self._tick()
+            except Exception as e: print(f"❌ Relay Error: {e}")
+
+    def _tick(self):
+        now = time.monotonic()
+        for addr in [a for a, (_, _, exp) in self.subscribers.items() if exp < now]:
+            print(f"📡 RELAY: {addr} subscription expired")
+            self._drop(addr)
+
+        for rig_id, body in self.records():
+            record = pad_record(body)
+            seq = self.seq[rig_id] = self.seq.get(rig_id, 0) + 1
+            for addr, (rig, hz, _) in self.subscribers.items():
+                if rig not in ("*", rig_id): continue
+                stream = self.streams.get((addr, rig_id))
+                if stream is None: stream = self.streams[(addr, rig_id)] = Stream(1.0 / hz)
+                self._send(stream, rig_id, seq, record, now, lambda d, a=addr: self.transport.sendto(d, a))
+            if self.mcast_sock:
+                stream = self.streams.get(("multicast", rig_id))
+                if stream is None: stream = self.streams[("multicast", rig_id)] = Stream(1.0 / self.multicast_hz)
+                self._send(stream, rig_id, seq, record, now,
+                           lambda d: self.mcast_sock.sendto(d, (self.multicast_group, self.multicast_port)))
+
+    def _send(self, stream, rig_id, seq, record, now, sendto):
+        if now < stream.next_due: return
+        stream.next_due = now + stream.interval
+        rig = rig_id.encode()[:16]
+        if stream.force_key or stream.last_record is None or stream.since_key >= self.keyframe_interval:
+            frame = FRAME.pack(MAGIC, LAYOUT_VERSION, KEY, rig, seq, 0) + record
+            stream.since_key = 0
+            stream.force_key = False
+            self.keyframes_sent += 1
+        else:
+            frame = FRAME.pack(MAGIC, LAYOUT_VERSION, DELTA, rig, seq, stream.last_seq) + encode_delta(stream.last_record, record)
+            stream.since_key += 1
+        try:
+            sendto(frame)
+        except (BlockingIOError, OSError):
+            stream.force_key = True  # Dropped locally: next frame must not depend on it
+            return
+        stream.last_record = record
+        stream.last_seq = seq
+        self.frames_sent += 1
+        self.bytes_sent += len(frame)
+
+    def snapshot(self):
+        return {"subscribers": len(self.subscribers), "frames": self.frames_sent,
+                "bytes": self.bytes_sent, "keyframes": self.keyframes_sent}
+
+
+# --- CLIENT LIBRARY ---
+class RelayClient:
+    """Subscribes to a TelemetryRelay and decodes frames into state_shm.StateView objects.
+
+        client = RelayClient("192.168.4.221", 20778, rig_id="RIG-1", max_hz=10)
+        while True:
+            for view in client.poll(): print(view.rig_id, view.telemetry)
+
+    With multicast_group set, `port` is the relay's multicast port and no
+    subscription is sent; the rate is whatever the relay multicasts at.
+    """
+    def __init__(self, host, port, rig_id="*", max_hz=10, multicast_group=None):
+        self.addr = (host, port)
+        self.rig_id = rig_id
+        self.max_hz = max_hz
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.multicast = bool(multicast_group)
+        if self.multicast:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.sock.bind(("", port))
+            mreq = socket.inet_aton(multicast_group) + socket.inet_aton("0.0.0.0")
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        self.records = {}    # rig_id -> (seq, record)
+        self.last_renew = 0.0
+        self.nonce = None    # From the relay's NONCE reply, echoed in every SUB
+        self.frames = 0
+        self.bytes = 0
+        self.resyncs = 0
+        self.rejected = 0    # Frames that could not be decoded
+
+    def _renew(self, force=False):
+        if self.multicast: return
+        now = time.monotonic()
+        if force or now - self.last_renew >= RENEW_INTERVAL:
+            sub = f"SUB {self.rig_id} {self.max_hz}{f' {self.nonce}' if self.nonce else ''}"
+            self.sock.sendto(sub.encode().ljust(SUB_PAD), self.addr)
+            self.last_renew = now
+
+    def poll(self, timeout=0.1):
+        """Returns decoded views for every frame received within `timeout`."""
+        self._renew()
+        views = []
+        self.sock.settimeout(timeout)
+        while True:
+            try:
+                data, _ = self.sock.recvfrom(65536)
+            except (socket.timeout, BlockingIOError):
+                break
+            self.sock.settimeout(0)
+            if data.startswith(NONCE_PREFIX):
+                # First SUB (or a relay restart): echo the nonce to start the stream
+                self.nonce = data[len(NONCE_PREFIX):].decode('ascii', errors='ignore').strip()
+                self._renew(force=True)
+                continue
+            view = self._handle(data)
+            if view is not None: views.append(view)
+        return views
+
+    def _handle(self, data):
+        if len(data) < FRAME.size: return None
+        magic, version, kind, rig, seq, base_seq = FRAME.unpack_from(data)
+        if magic != MAGIC or version != LAYOUT_VERSION: return None
+        rig_id = rig.rstrip(b"\x00").decode('utf-8', errors='ignore')
+        payload = data[FRAME.size:]
+        if kind == KEY:
+            if len(payload) != RECORD_SIZE: return self._reject()
+            record = payload
+        else:
+            prev = self.records.get(rig_id)
+            if prev is None or prev[0] != base_seq:
+                # Missed the frame this delta builds on: ask for a keyframe
+                self.resyncs += 1
+                if not self.multicast: self.sock.sendto(f"KEY {rig_id}".encode(), self.addr)
+                return None
+            try: record = apply_delta(prev[1], payload)
+            except ValueError: return self._reject()
+        self.records[rig_id] = (seq, record)
+        self.frames += 1
+        self.bytes += len(data)
+        try:
+            return unpack_state(record[:BODY_SIZE])
+        except (ValueError, struct.error, IndexError):
+            return self._reject()  # e.g. a record the Brain never filled in
+
+    def _reject(self):
+        self.rejected += 1
+        return None
+
+    def close(self):
+        if not self.multicast:
+            try: self.sock.sendto(b"BYE", self.addr)
+            except OSError: pass
+        self.sock.close()
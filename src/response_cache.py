@@ -0,0 +1,93 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# --- TELEMETRY BUCKETS ---
+# An answer stays valid while every bucket it was computed from is unchanged.
+GAP_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0)  # s; DRS range, close, ..., out of reach
+SPEED_BAND = 50                            # KPH
+
+_FILLER = re.compile(r"\b(uh+|um+|er+|hey|please|mate)\b")
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+
+
+def normalize_transcript(text):
+    text = _NON_WORD.sub(" ", text.lower())
+    text = _FILLER.sub(" ", text)
+    return " ".join(text.split())
+
+
+def gap_bucket(gap):
+    if gap == 0.0: return -1  # Clear air
+    for i, edge in enumerate(GAP_BUCKETS):
+        if abs(gap) < edge: return i
+    return len(GAP_BUCKETS)
+
+
+def telemetry_signature(state):
+    t = state.telemetry
+    return (t['pos'], gap_bucket(t['gap_ahead']), gap_bucket(t['gap_behind']),
+            t['speed'] // SPEED_BAND, state.vision_data is not None)
+
+
+# --- RESPONSE CACHE ---
+class ResponseCache:
+    """LRU + TTL cache of LLM answers keyed by (rig, normalized transcript).
+
+    Each rig's entries are dropped as soon as its telemetry signature moves to
+    a different bucket, so a cached answer never describes a stale race state.
+    """
+    def __init__(self, max_entries=64, ttl=15.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # (rig_id, text) -> (response, created, latency_s)
+        self.signatures = {}          # rig_id -> signature the rig's entries were computed under
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.saved_s = 0.0
+
+    def get(self, rig_id, text, signature):
+        key = (rig_id, normalize_transcript(text))
+        now = time.monotonic()
+        with self.lock:
+            self._check_signature(rig_id, signature)
+            entry = self.entries.get(key)
+            if entry and now - entry[1] <= self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                self.saved_s += entry[2]
+                return entry[0]
+            if entry: del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, rig_id, text, signature, response, latency_s):
+        key = (rig_id, normalize_transcript(text))
+        with self.lock:
+            self._check_signature(rig_id, signature)
+            self.entries[key] = (response, time.monotonic(), latency_s)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def _check_signature(self, rig_id, signature):
+        if self.signatures.get(rig_id) == signature: return
+        self.signatures[rig_id] = signature
+        stale = [k for k in self.entries if k[0] == rig_id]
+        for k in stale: del self.entries[k]
+        self.invalidations += len(stale)
+
+    def snapshot(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 2) if lookups else 0.0,
+                "invalidations": self.invalidations, "evictions": self.evictions,
+                "saved_ms": round(self.saved_s * 1000, 1),
+            }
@@ -0,0 +1,114 @@
+import threading
+import time
+
+
+# --- PER-RIG SESSION REGISTRY ---
+class SessionRegistry:
+    """Maps traffic to one session per rig.
+
+    A rig is identified by its handshake ID when it sent one, else by the
+    `rigs` aliases in settings.json ("host:port" first, then "host"), else by
+    the ID its host last sent in a handshake, else by its source IP.
+    `factory(rig_id, host)` builds a new session on first contact.
+
+    Telemetry has no handshake, so a rig usually shows up under its IP first.
+    Its first handshake moves that host to the handshake ID and evicts the
+    IP-keyed session.
+
+    Sessions cost shared memory, a speech thread and history, so there are at
+    most `max_sessions`: a new rig evicts the least recently heard one, and
+    expire() drops any silent for `idle_timeout` seconds. Rigs listed in
+    `rigs` are never evicted; with `listed_only` they are the only ones
+    accepted. `on_evict(session)` releases an evicted session. resolve()
+    returns None for traffic that gets no session.
+    """
+    def __init__(self, factory, aliases=None, max_sessions=8, idle_timeout=300.0,
+                 listed_only=False, on_evict=None):
+        self.factory = factory
+        self.aliases = aliases or {}
+        self.pinned = set(self.aliases.values())
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.listed_only = listed_only
+        self.on_evict = on_evict
+        self.sessions = {}
+        self.order = []
+        self.last_seen = {}   # key -> time.monotonic() of its latest traffic
+        self.hosts = {}       # host -> rig_id from its latest handshake
+        self.selected = 0
+        self.evicted = 0
+        self.refused = 0
+        self.lock = threading.Lock()
+
+    def resolve(self, host, port=None, rig_id=None):
+        if rig_id and self.hosts.get(host) != rig_id:
+            if self.listed_only and rig_id not in self.pinned:
+                self.refused += 1
+                return None
+            self._bind_host(host, rig_id)
+        key = (rig_id or self.aliases.get(f"{host}:{port}") or self.aliases.get(host)
+               or self.hosts.get(host) or host)
+        session = self.sessions.get(key)
+        if session is None:
+            if self.listed_only and key not in self.pinned:
+                self.refused += 1
+                return None
+            with self.lock:
+                session = self.sessions.get(key)
+                if session is None:
+                    if len(self.sessions) >= self.max_sessions and not self._evict_oldest():
+                        self.refused += 1
+                        return None
+                    session = self.factory(key, host)
+                    self.sessions[key] = session
+                    self.order.append(key)
+                    print(f"🏁 RIG: New session '{key}' ({host})")
+        self.last_seen[key] = time.monotonic()
+        return session
+
+    def expire(self):
+        """Evicts unlisted sessions with no traffic for idle_timeout seconds."""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self.lock:
+            for key in [k for k in self.order if k not in self.pinned and self.last_seen.get(k, 0.0) < cutoff]:
+                print(f"🏁 RIG: '{key}' idle for {self.idle_timeout:.0f}s, closing session")
+                self._remove(key)
+
+    def _evict_oldest(self):
+        candidates = [k for k in self.order if k not in self.pinned]
+        if not candidates: return False
+        key = min(candidates, key=lambda k: self.last_seen.get(k, 0.0))
+        print(f"🏁 RIG: {self.max_sessions} sessions open, closing least recent '{key}'")
+        self._remove(key)
+        return True
+
+    def _bind_host(self, host, rig_id):
+        with self.lock:
+            self.hosts[host] = rig_id
+            if host != rig_id and host in self.sessions:
+                print(f"🏁 RIG: '{host}' identified as '{rig_id}', merging sessions")
+                self._remove(host)
+
+    def _remove(self, key):
+        """Caller holds self.lock."""
+        session = self.sessions.pop(key)
+        pos = self.order.index(key)
+        self.order.remove(key)
+        if self.selected > pos: self.selected -= 1
+        self.last_seen.pop(key, None)
+        for host in [h for h, r in self.hosts.items() if r == key]: del self.hosts[host]
+        self.evicted += 1
+        if self.on_evict: self.on_evict(session)
+
+    def current(self):
+        """The session shown on the dashboard, or None before any rig connects."""
+        order = list(self.order)
+        if not order: return None
+        return self.sessions.get(order[self.selected % len(order)])
+
+    def cycle(self):
+        if self.order: self.selected = (self.selected + 1) % len(self.order)
+
+    def all(self):
+        sessions = [self.sessions.get(k) for k in list(self.order)]
+        return [s for s in sessions if s is not None]
@@ -0,0 +1,272 @@
+import re
+import struct
+from multiprocessing import shared_memory, resource_tracker
+
+from model_loader import STATUSES
+
+# --- SHARED MEMORY LAYOUT ---
+# [seq u64][header][22 x car][22 x standing][health]
+# seq is a seqlock counter: odd while the Brain is writing, even when stable.
+# Readers copy the body and retry if seq changed underneath them.
+LAYOUT_VERSION = 2
+MAX_CARS = 22
+MAX_PIDS = 16
+
+SEQ = struct.Struct('<Q')
+HEADER = struct.Struct('<B16s??BBBBHIffBf')  # version, rig_id, active, vision, player_idx, sector, rank, n_standings, speed, lap_time, gap_ahead, gap_behind, brain status, time_to_ready
+CAR = struct.Struct('<Bh8sfff')           # flags, team (-1 = unknown), name, x, z, dist
+STANDING = struct.Struct('<Bf')           # car idx, gap to car ahead (s)
+HEALTH_HEAD = struct.Struct('<BI')        # n_pids, malformed
+PACKET = struct.Struct('<BIIfffffIII')    # pid, packets, bytes, pps, bps, decode_avg_us, decode_max_us, time_gap, frame_gap, dropped, out_of_order
+
+CAR_PRESENT, CAR_HAS_XZ = 1, 2
+
+BODY_SIZE = (HEADER.size + CAR.size * MAX_CARS + STANDING.size * MAX_CARS
+             + HEALTH_HEAD.size + PACKET.size * MAX_PIDS)
+SIZE = SEQ.size + BODY_SIZE
+
+# Vision slot: a separate block so a 50 KB JPEG never slows the state seqlock.
+# [seq u64][frame_id, received (unix time), length][jpeg]
+VISION_HEAD = struct.Struct('<IdI')
+MAX_VISION_JPEG = 512 * 1024              # Larger frames are not shared
+VISION_SIZE = SEQ.size + VISION_HEAD.size + MAX_VISION_JPEG
+
+
+def shm_name(rig_id):
+    return "f1copilot_" + re.sub(r'[^A-Za-z0-9_-]', '_', str(rig_id))
+
+
+def vision_shm_name(rig_id):
+    return shm_name(rig_id) + "_vision"
+
+
+# --- DECODED VIEW (what a dashboard renders) ---
+class StateView:
+    def __init__(self):
+        self.rig_id = "--"
+        self.active = False
+        self.vision_data = False
+        self.player_idx = 0
+        self.telemetry = {
+            "speed": 0, "lap_time": 0, "sector": 0,
+            "gap_ahead": 0.0, "gap_behind": 0.0, "pos": "P--"
+        }
+        self.cars = {}
+        self.standings = []
+        self.health = {"packets": {}, "malformed": 0}
+        self.brain_status = None    # One of model_loader.STATUSES once a Brain has published
+        self.time_to_ready = None
+
+
+def pack_state(buf, state, health, brain_status, time_to_ready):
+    """Serialises a SharedState (+ its health snapshot and Brain readiness) into buf at offset 0."""
+    t = state.telemetry
+    standings = state.standings[:MAX_CARS]
+    rank = int(t['pos'][1:]) if t['pos'][1:].isdigit() else 0
+    HEADER.pack_into(buf, 0, LAYOUT_VERSION, str(state.rig_id).encode()[:16],
+                     state.active, state.vision_data is not None, state.player_idx,
+                     t['sector'], rank, len(standings), t['speed'], t['lap_time'],
+                     t['gap_ahead'], t['gap_behind'], STATUSES.index(brain_status),
+                     -1.0 if time_to_ready is None else time_to_ready)
+    off = HEADER.size
+    for i in range(MAX_CARS):
+        car = state.cars.get(i)
+        if car is None:
+            CAR.pack_into(buf, off, 0, 0, b'', 0.0, 0.0, 0.0)
+        else:
+            flags = CAR_PRESENT | (CAR_HAS_XZ if 'x' in car else 0)
+            CAR.pack_into(buf, off, flags, car.get('team', -1), car.get('name', '').encode()[:8],
+                          car.get('x', 0.0), car.get('z', 0.0), car.get('dist', 0.0))
+        off += CAR.size
+    for i in range(MAX_CARS):
+        idx, gap = (standings[i][0], standings[i][2]) if i < len(standings) else (0, 0.0)
+        STANDING.pack_into(buf, off, idx, gap)
+        off += STANDING.size
+
+    packets = list(health["packets"].items())[:MAX_PIDS]
+    HEALTH_HEAD.pack_into(buf, off, len(packets), health["malformed"])
+    off += HEALTH_HEAD.size
+    for pid, p in packets:
+        PACKET.pack_into(buf, off, pid, p["packets"], p["bytes"], p["pps"], p["bps"],
+                         p["decode_avg_us"], p["decode_max_us"], p["time_gap"],
+                         p["frame_gap"], p["dropped"], p["out_of_order"])
+        off += PACKET.size
+
+
+def unpack_state(body):
+    view = StateView()
+    (version, rig_id, view.active, view.vision_data, view.player_idx, sector, rank,
+     n_standings, speed, lap_time, gap_ahead, gap_behind, status, time_to_ready) = HEADER.unpack_from(body, 0)
+    if version != LAYOUT_VERSION:
+        raise ValueError(f"shared memory layout v{version}, expected v{LAYOUT_VERSION}")
+    view.rig_id = rig_id.rstrip(b'\x00').decode('utf-8', errors='ignore')
+    view.brain_status = STATUSES[status]
+    view.time_to_ready = None if time_to_ready < 0 else time_to_ready
+    view.telemetry = {
+        "speed": speed, "lap_time": lap_time, "sector": sector,
+        "gap_ahead": gap_ahead, "gap_behind": gap_behind,
+        "pos": f"P{rank}" if rank else "P--"
+    }
+    off = HEADER.size
+    for i in range(MAX_CARS):
+        flags, team, name, x, z, dist = CAR.unpack_from(body, off)
+        off += CAR.size
+        if not flags & CAR_PRESENT: continue
+        car = {'team': team, 'dist': dist,
+               'name': name.rstrip(b'\x00').decode('utf-8', errors='ignore')}
+        if flags & CAR_HAS_XZ: car['x'] = x; car['z'] = z
+        view.cars[i] = car
+    for i in range(MAX_CARS):
+        idx, gap = STANDING.unpack_from(body, off)
+        off += STANDING.size
+        if i < n_standings and idx in view.cars:
+            view.standings.append((idx, view.cars[idx], gap))
+
+    n_pids, malformed = HEALTH_HEAD.unpack_from(body, off)
+    off += HEALTH_HEAD.size
+    packets = {}
+    for _ in range(n_pids):
+        (pid, n, nbytes, pps, bps, dec_avg, dec_max, time_gap,
+         frame_gap, dropped, ooo) = PACKET.unpack_from(body, off)
+        off += PACKET.size
+        packets[pid] = {
+            "packets": n, "bytes": nbytes, "pps": pps, "bps": bps,
+            "decode_avg_us": dec_avg, "decode_max_us": dec_max,
+            "frame_gap": frame_gap, "time_gap": time_gap,
+            "dropped": dropped, "out_of_order": ooo,
+        }
+    view.health = {"packets": packets, "malformed": malformed}
+    return view
+
+
+# --- BLOCK LIFECYCLE ---
+def _create_block(name, size):
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        # Left behind by a Brain that crashed; take it over
+        shm = shared_memory.SharedMemory(name=name)
+        if shm.size < size:
+            shm.close()
+            raise
+        return shm
+
+
+def _attach_block(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13: stop the resource tracker unlinking it on exit
+        shm = shared_memory.SharedMemory(name=name)
+        try: resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception: pass
+        return shm
+
+
+# --- WRITER (Brain) ---
+class StatePublisher:
+    def __init__(self, rig_id):
+        self.name = shm_name(rig_id)
+        self.shm = _create_block(self.name, SIZE)
+        self.scratch = bytearray(BODY_SIZE)  # Latest body; all zeros until the first publish()
+        self.published = False
+        self.seq = SEQ.unpack_from(self.shm.buf, 0)[0] & ~1
+
+    def publish(self, state, health, brain_status, time_to_ready):
+        pack_state(self.scratch, state, health, brain_status, time_to_ready)
+        buf = self.shm.buf
+        self.seq += 1
+        SEQ.pack_into(buf, 0, self.seq)                  # odd: write in progress
+        buf[SEQ.size:SEQ.size + BODY_SIZE] = self.scratch
+        self.seq += 1
+        SEQ.pack_into(buf, 0, self.seq)                  # even: stable
+        self.published = True
+
+    def close(self):
+        self.shm.close()
+        try: self.shm.unlink()
+        except FileNotFoundError: pass
+
+
+class VisionPublisher:
+    """Latest camera JPEG for one rig, behind its own seqlock."""
+    def __init__(self, rig_id):
+        self.name = vision_shm_name(rig_id)
+        self.shm = _create_block(self.name, VISION_SIZE)
+        self.seq = SEQ.unpack_from(self.shm.buf, 0)[0] & ~1
+        self.frame_id = VISION_HEAD.unpack_from(self.shm.buf, SEQ.size)[0]  # Keep counting after a takeover
+
+    def publish(self, jpeg, received):
+        if len(jpeg) > MAX_VISION_JPEG: return
+        buf = self.shm.buf
+        self.frame_id += 1
+        self.seq += 1
+        SEQ.pack_into(buf, 0, self.seq)
+        VISION_HEAD.pack_into(buf, SEQ.size, self.frame_id, received, len(jpeg))
+        start = SEQ.size + VISION_HEAD.size
+        buf[start:start + len(jpeg)] = jpeg
+        self.seq += 1
+        SEQ.pack_into(buf, 0, self.seq)
+
+    def close(self):
+        self.shm.close()
+        try: self.shm.unlink()
+        except FileNotFoundError: pass
+
+
+# --- READER (dashboards) ---
+class StateReader:
+    """Read-only attachment: never writes to the block and never unlinks it."""
+    def __init__(self, rig_id):
+        self.name = shm_name(rig_id)
+        self.shm = _attach_block(self.name)
+        self.last_seq = None
+        self.last = StateView()
+        self.retries = 0
+
+    def read(self, attempts=100):
+        """Latest consistent view; the previous one if the writer kept us out."""
+        buf = self.shm.buf
+        for _ in range(attempts):
+            seq = SEQ.unpack_from(buf, 0)[0]
+            if seq & 1:
+                self.retries += 1
+                continue
+            if seq == self.last_seq or seq == 0: return self.last  # Unchanged / nothing published yet
+            body = bytes(buf[SEQ.size:SEQ.size + BODY_SIZE])
+            if SEQ.unpack_from(buf, 0)[0] != seq:
+                self.retries += 1
+                continue
+            self.last = unpack_state(body)
+            self.last_seq = seq
+            return self.last
+        return self.last
+
+    def close(self):
+        self.shm.close()
+
+
+class VisionReader:
+    """Read-only; copies the JPEG out only when a new frame has been published."""
+    def __init__(self, rig_id):
+        self.name = vision_shm_name(rig_id)
+        self.shm = _attach_block(self.name)
+        self.last_seq = None
+        self.last = None   # (frame_id, jpeg, received)
+
+    def read(self, attempts=10):
+        buf = self.shm.buf
+        for _ in range(attempts):
+            seq = SEQ.unpack_from(buf, 0)[0]
+            if seq & 1: continue
+            if seq == self.last_seq or seq == 0: return self.last
+            frame_id, received, length = VISION_HEAD.unpack_from(buf, SEQ.size)
+            start = SEQ.size + VISION_HEAD.size
+            jpeg = bytes(buf[start:start + min(length, MAX_VISION_JPEG)])
+            if SEQ.unpack_from(buf, 0)[0] != seq: continue
+            self.last = (frame_id, jpeg, received)
+            self.last_seq = seq
+            return self.last
+        return self.last
+
+    def close(self):
+        self.shm.close()
@@ -0,0 +1,159 @@
+import struct
+import threading
+import time
+from collections import deque
+
+# --- PACKET HEADER (F1 22/23) ---
+# Byte 5 = packetId, Byte 14 = sessionTime (float), Byte 18 = frameIdentifier (uint32)
+HEADER_SIZE = 24
+HEADER_TIMING = struct.Struct('<fI')
+HEADER_TIMING_OFFSET = 14
+
+PACKET_NAMES = {
+    0: "Motion", 1: "Session", 2: "Lap Data", 3: "Event",
+    4: "Partic.", 5: "Setups", 6: "Telem.", 7: "Status",
+    8: "Class", 9: "Lobby", 10: "Damage", 11: "History"
+}
+
+# Sent when something happens (Event, Final Classification), not at a fixed rate: no drop counting
+SPORADIC_PIDS = {3, 8}
+
+RATE_WINDOW = 1.0  # Seconds per packets/s + bytes/s sample
+GAP_WINDOW = 31    # Recent frame gaps the expected send interval is the median of
+GAP_MIN_SAMPLES = 5
+
+
+# --- PER PACKET TYPE COUNTERS ---
+class PacketStats:
+    def __init__(self, fixed_rate=True):
+        self.fixed_rate = fixed_rate
+        self.packets = 0
+        self.bytes = 0
+        self.pps = 0.0
+        self.bps = 0.0
+        self.decode_avg = 0.0   # EMA, seconds
+        self.decode_max = 0.0
+        self.frame_gap = 0      # Last frameIdentifier delta
+        self.time_gap = 0.0     # Last sessionTime delta
+        self.gaps = deque(maxlen=GAP_WINDOW)  # Recent frame deltas; median = expected send interval
+        self.dropped = 0
+        self.out_of_order = 0
+        self.last_frame = None
+        self.last_session_time = None
+        self._win_start = time.perf_counter()
+        self._win_packets = 0
+        self._win_bytes = 0
+
+    def record(self, size, decode_s, session_time, frame_id, now):
+        self.packets += 1
+        self.bytes += size
+        self._win_packets += 1
+        self._win_bytes += size
+
+        self.decode_avg = decode_s if self.packets == 1 else (self.decode_avg * 0.9 + decode_s * 0.1)
+        self.decode_max = max(self.decode_max, decode_s)
+
+        if self.last_frame is not None:
+            delta = frame_id - self.last_frame
+            if delta <= 0 and session_time < self.last_session_time - 1.0:
+                # Session restart (flashback / new session): start over
+                self.gaps.clear()
+            elif delta == 0:
+                # Same game frame (several Events fire in one frame): not a reorder
+                self._roll(now)
+                return
+            elif delta < 0:
+                self.out_of_order += 1
+                return
+            else:
+                self.frame_gap = delta
+                self.time_gap = session_time - self.last_session_time
+                if self.fixed_rate:
+                    expected = self.expected_gap()
+                    if expected and delta >= expected * 2:
+                        self.dropped += (delta // expected) - 1
+                    self.gaps.append(delta)
+
+        self.last_frame = frame_id
+        self.last_session_time = session_time
+        self._roll(now)
+
+    def expected_gap(self):
+        """Median recent frame delta, or 0 until enough packets have been seen."""
+        if len(self.gaps) < GAP_MIN_SAMPLES: return 0
+        return sorted(self.gaps)[len(self.gaps) // 2]
+
+    def _roll(self, now):
+        elapsed = now - self._win_start
+        if elapsed >= RATE_WINDOW:
+            self.pps = self._win_packets / elapsed
+            self.bps = self._win_bytes / elapsed
+            self._win_start = now
+            self._win_packets = 0
+            self._win_bytes = 0
+
+    def as_dict(self):
+        return {
+            "packets": self.packets, "bytes": self.bytes,
+            "pps": round(self.pps, 1), "bps": round(self.bps, 1),
+            "decode_avg_us": round(self.decode_avg * 1e6, 1),
+            "decode_max_us": round(self.decode_max * 1e6, 1),
+            "frame_gap": self.frame_gap, "time_gap": round(self.time_gap, 4),
+            "dropped": self.dropped, "out_of_order": self.out_of_order,
+        }
+
+
+# --- INGESTION + RENDER INSTRUMENTATION ---
+class TelemetryHealth:
+    def __init__(self, fps_target):
+        self.lock = threading.Lock()
+        self.packets = {}
+        self.malformed = 0
+        self.frame_budget = 1.0 / max(1, fps_target)
+        self.frame_avg = 0.0
+        self.frame_max = 0.0
+        self.frames = 0
+        self.frames_over = 0
+
+    def record_packet(self, pid, data, decode_s):
+        """Called once per UDP datagram, after decode."""
+        now = time.perf_counter()
+        if len(data) < HEADER_SIZE:
+            self.record_malformed()
+            return
+        session_time, frame_id = HEADER_TIMING.unpack_from(data, HEADER_TIMING_OFFSET)
+        with self.lock:
+            stats = self.packets.get(pid)
+            if stats is None:
+                stats = self.packets[pid] = PacketStats(fixed_rate=pid not in SPORADIC_PIDS)
+            stats.record(len(data), decode_s, session_time, frame_id, now)
+
+    def record_malformed(self):
+        """A datagram too short for its packet type, or one that failed to decode."""
+        with self.lock: self.malformed += 1
+
+    def record_frame(self, frame_s):
+        """Called once per render loop iteration with the work time of that frame."""
+        with self.lock:
+            self.frames += 1
+            self.frame_avg = frame_s if self.frames == 1 else (self.frame_avg * 0.95 + frame_s * 0.05)
+            self.frame_max = max(self.frame_max, frame_s)
+            if frame_s > self.frame_budget: self.frames_over += 1
+
+    def snapshot(self):
+        """Plain-dict copy of every counter, safe to call from any thread."""
+        now = time.perf_counter()
+        with self.lock:
+            for stats in self.packets.values():
+                stats._roll(now)
+            return {
+                "packets": {pid: s.as_dict() for pid, s in sorted(self.packets.items())},
+                "malformed": self.malformed,
+                "render": {
+                    "frames": self.frames,
+                    "frame_avg_ms": round(self.frame_avg * 1000, 2),
+                    "frame_max_ms": round(self.frame_max * 1000, 2),
+                    "budget_ms": round(self.frame_budget * 1000, 2),
+                    "over_budget": self.frames_over,
+                },
+            }
@@ -0,0 +1,87 @@
+from array import array
+
+# --- MINISECTOR GRID ---
+MINISECTOR_M = 25.0                    # Fixed minisector length along lapDistance
+MAX_TRACK_M = 8000.0                   # Longest calendar track (Spa ~7km) with margin
+N_MINISECTORS = int(MAX_TRACK_M // MINISECTOR_M)
+MAX_CARS = 22
+NO_TIME = -1.0
+WRAP_M = 1000.0                        # lapDistance dropping by more than this = new lap
+MAX_STEP = 40                          # Boundaries per packet beyond which a jump is a teleport
+
+
+# --- TIMING INDEX ---
+class TimingIndex:
+    """sessionTime at which each car last crossed each minisector boundary.
+
+    One flat, preallocated array of MAX_CARS x N_MINISECTORS. The interval
+    between two cars is the time the car behind crossed its latest boundary
+    minus the time the car ahead crossed that same boundary: one lookup,
+    and correct in slow corners where distance / speed is not.
+    Set `track_length` from the Session packet; until then the longest
+    lapDistance seen stands in for it.
+    """
+    def __init__(self):
+        self.crossings = array('d', [NO_TIME]) * (MAX_CARS * N_MINISECTORS)
+        self.last_ms = array('i', [-1]) * MAX_CARS      # Latest boundary crossed per car
+        self.last_dist = array('d', [0.0]) * MAX_CARS
+        self.last_time = array('d', [NO_TIME]) * MAX_CARS
+        self.track_length = 0.0
+        self.max_lap_dist = 0.0
+
+    def reset(self):
+        self.crossings[:] = array('d', [NO_TIME]) * len(self.crossings)
+        for i in range(MAX_CARS):
+            self.last_ms[i] = -1; self.last_dist[i] = 0.0; self.last_time[i] = NO_TIME
+        self.max_lap_dist = 0.0
+
+    def lap_length(self):
+        """Track length in metres, 0.0 while unknown."""
+        return self.track_length or self.max_lap_dist
+
+    def update(self, car, lap_distance, session_time):
+        """Feed one car's lapDistance (packet 2) at the packet's sessionTime."""
+        if lap_distance < 0 or car >= MAX_CARS: return  # Before the line on lap 1
+        prev_t = self.last_time[car]
+        if prev_t != NO_TIME and session_time < prev_t - 1.0:
+            self.reset()  # Flashback / session restart
+            prev_t = NO_TIME
+
+        ms = min(int(lap_distance // MINISECTOR_M), N_MINISECTORS - 1)
+        prev_ms = self.last_ms[car]
+        base = car * N_MINISECTORS
+        if prev_ms < 0 or prev_t == NO_TIME:
+            self.crossings[base + ms] = session_time  # First sample for this car
+        elif ms != prev_ms:
+            prev_d = self.last_dist[car]
+            if ms > prev_ms:
+                first, lap_offset = prev_ms + 1, 0.0
+            elif prev_d - lap_distance > WRAP_M:
+                # Crossed the line: new-lap distances continue from the track length
+                first, lap_offset = 0, max(self.lap_length(), prev_d)
+            else:
+                return  # Rolling backwards: keep the original crossing times
+
+            if ms - first >= MAX_STEP:
+                self.crossings[base + ms] = session_time  # Teleport (reset to track), not a crossing
+            else:
+                # Interpolate the exact crossing time of every boundary passed since the last packet
+                span_d = lap_distance + lap_offset - prev_d
+                span_t = session_time - prev_t
+                for k in range(first, ms + 1):
+                    frac = (k * MINISECTOR_M + lap_offset - prev_d) / span_d if span_d > 0 else 1.0
+                    self.crossings[base + k] = prev_t + min(max(frac, 0.0), 1.0) * span_t
+
+        self.last_ms[car] = ms
+        self.last_dist[car] = lap_distance
+        if lap_distance > self.max_lap_dist: self.max_lap_dist = lap_distance
+        self.last_time[car] = session_time
+
+    def interval(self, behind, ahead):
+        """Seconds between `ahead` and `behind` at behind's latest boundary, or None if unknown."""
+        ms = self.last_ms[behind]
+        if ms < 0: return None
+        t_behind = self.crossings[behind * N_MINISECTORS + ms]
+        t_ahead = self.crossings[ahead * N_MINISECTORS + ms]
+        if t_behind == NO_TIME or t_ahead == NO_TIME or t_ahead > t_behind: return None
+        return t_behind - t_ahead
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pygame
+
+STALE_AFTER = 2.0  # Seconds without a new frame before the preview is flagged
+
+
+# --- OFF-THREAD JPEG DECODE ---
+class VisionPreview(threading.Thread):
+    """Decodes the newest camera JPEG into a ready-to-blit pygame surface.
+
+    The render loop hands over frames with submit() (cheap: it only compares
+    frame keys) and blits whatever `frame` holds. The worker decodes at half
+    resolution straight into a numpy array, swaps BGR to RGB in place and
+    wraps that memory as a surface without copying it. Frames that arrive
+    while a decode is running are replaced, not queued.
+    """
+    def __init__(self):
+        super().__init__(daemon=True, name="vision-preview")
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.pending = None       # (key, jpeg, received) newest frame not decoded yet
+        self.submitted = None     # Key of the last frame handed over
+        self.frame = None         # (key, surface, pixels, received); pixels backs the surface
+        self.available = True     # False when OpenCV / numpy are missing
+        self.decoded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.decode_avg = 0.0     # EMA, seconds
+        self.decode_max = 0.0
+
+    def submit(self, frame):
+        """frame = (key, jpeg, received unix time) or None. Unchanged keys are ignored."""
+        if frame is None or frame[0] == self.submitted or not self.available: return
+        with self.lock:
+            if self.pending is not None: self.skipped += 1
+            self.pending = frame
+            self.submitted = frame[0]
+        self.wake.set()
+
+    def run(self):
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:
+            self.available = False
+            print("⚠️ VISION PREVIEW: opencv-python / numpy not installed, preview disabled")
+            return
+
+        while True:
+            self.wake.wait()
+            self.wake.clear()
+            with self.lock:
+                frame, self.pending = self.pending, None
+            if frame is None: continue
+            key, jpeg, received = frame
+
+            t0 = time.perf_counter()
+            pixels = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+            if pixels is None:
+                self.failed += 1
+                continue
+            cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB, dst=pixels)
+            h, w = pixels.shape[:2]
+            surface = pygame.image.frombuffer(pixels, (w, h), 'RGB')
+            decode_s = time.perf_counter() - t0
+
+            self.decoded += 1
+            self.decode_avg = decode_s if self.decoded == 1 else (self.decode_avg * 0.9 + decode_s * 0.1)
+            self.decode_max = max(self.decode_max, decode_s)
+            self.frame = (key, surface, pixels, received)  # Single assignment: the renderer sees old or new
+
+    def age(self):
+        frame = self.frame
+        return None if frame is None else max(0.0, time.time() - frame[3])
+
+    def snapshot(self):
+        age = self.age()
+        return {
+            "available": self.available,
+            "decoded": self.decoded, "skipped": self.skipped, "failed": self.failed,
+            "decode_avg_ms": self.decode_avg * 1000, "decode_max_ms": self.decode_max * 1000,
+            "age_ms": None if age is None else age * 1000,
+            "behind": self.frame is not None and self.frame[0] != self.submitted,
+        }
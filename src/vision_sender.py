@@ -21,6 +21,7 @@ with open(CONFIG_PATH, "r") as f:
 # MAP CONFIG KEYS
 TARGET_IP = config["network"]["target_brain_ip"] # <--- UPDATED
 TARGET_PORT = config["network"]["vision_port"]
+RIG_ID = config["network"].get("rig_id", "") # Sent as b"RIG:<id>\n" so a shared Brain can tell rigs apart
 
 # --- SETUP SCREEN CAPTURE ---
 sct = mss.mss()
@@ -47,6 +48,7 @@ while True:
         client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         client_socket.connect((TARGET_IP, TARGET_PORT))
         connection = client_socket.makefile('wb')
+        if RIG_ID: client_socket.sendall(f"RIG:{RIG_ID}\n".encode())
 
         print("✅ Linked to Brain. Streaming Vision...")
 
@@ -6,7 +6,6 @@ import threading
 import queue
 import time
 import uuid
-from pydub import AudioSegment
 
 try:
     import numpy as np
@@ -26,16 +25,20 @@ PIPER_EXE = os.path.join(BASE_DIR, "tools", "piper", "piper.exe")
 MODEL_PATH = os.path.join(BASE_DIR, "tools", "piper", "voice_model.onnx")
 FFMPEG_DIR = os.path.join(BASE_DIR, "tools", "ffmpeg")
 
-# Configure Pydub to use local FFmpeg
-if os.name == 'nt': 
-    AudioSegment.converter = os.path.join(FFMPEG_DIR, "ffmpeg.exe")
-    AudioSegment.ffmpeg = os.path.join(FFMPEG_DIR, "ffmpeg.exe")
-    AudioSegment.ffprobe = os.path.join(FFMPEG_DIR, "ffprobe.exe")
+def _load_pydub():
+    """Lazy import (pydub probes for ffmpeg on import); runs on the speech worker thread."""
+    from pydub import AudioSegment
+    # Configure Pydub to use local FFmpeg
+    if os.name == 'nt': 
+        AudioSegment.converter = os.path.join(FFMPEG_DIR, "ffmpeg.exe")
+        AudioSegment.ffmpeg = os.path.join(FFMPEG_DIR, "ffmpeg.exe")
+        AudioSegment.ffprobe = os.path.join(FFMPEG_DIR, "ffprobe.exe")
+    return AudioSegment
 
 class RaceEngineerVoice:
-    def __init__(self):
-        # Load network settings
-        self.target_ip = CONFIG["network"]["target_rig_ip"] # <--- UPDATED
+    def __init__(self, target_ip=None):
+        # Load network settings (target_ip overrides the config for multi-rig Brains)
+        self.target_ip = target_ip or CONFIG["network"]["target_rig_ip"] # <--- UPDATED
         self.target_port = CONFIG["network"]["voice_target_port"]
         
         self.speech_queue = queue.Queue()
@@ -44,6 +47,9 @@ class RaceEngineerVoice:
 
         print(f"🎙️  Neural Piper Voice Online. Target: {self.target_ip}:{self.target_port}")
 
+    def close(self):
+        self.speech_queue.put(None) # Worker exits after the current line
+
     def speak(self, text):
         clean_text = text.replace('"', '').replace("'", "")
         self.speech_queue.put(clean_text)
@@ -62,6 +68,7 @@ class RaceEngineerVoice:
         if not os.path.exists(PIPER_EXE):
             print(f"❌ CRITICAL: Piper not found at {PIPER_EXE}")
             return
+        AudioSegment = _load_pydub()
 
         while True:
             text = self.speech_queue.get()
@@ -0,0 +1,20 @@
+import os
+import socket
+import sys
+
+import pytest
+
+# Modules in src/ import each other as top-level modules (python src/main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+def _free_port(kind):
+    with socket.socket(socket.AF_INET, kind) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def free_port():
+    """free_port(socket.SOCK_DGRAM | SOCK_STREAM) -> an unused loopback port."""
+    return _free_port
@@ -0,0 +1,80 @@
+import asyncio
+import socket
+import threading
+import time
+
+from net_core import NetworkCore, FairScheduler
+
+N_RIGS = 8
+
+
+def _wait_for(cond, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not cond():
+        if time.monotonic() > end: raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def _send_utterance(port, rig_id):
+    with socket.create_connection(("127.0.0.1", port)) as s:
+        s.sendall(f"RIG:{rig_id}\n".encode() + b"\x01" * 8192)
+
+
+def test_round_robin_and_per_rig_shedding_over_loopback(free_port):
+    scheduler = FairScheduler("load", workers=1, max_pending=2)
+    served, arrived, results = [], [], []
+    gate = threading.Event()
+
+    def infer(rig_id, raw):
+        served.append(rig_id)
+        time.sleep(0.001)
+        return len(raw)
+
+    async def on_utterance(raw, host, rig_id):
+        arrived.append(rig_id)
+        results.append((rig_id, await scheduler.submit(rig_id, infer, rig_id, raw)))
+
+    ears = free_port(socket.SOCK_STREAM)
+    net = NetworkCore(free_port(socket.SOCK_DGRAM), ears, free_port(socket.SOCK_STREAM),
+                      on_packet=lambda data, addr: None, on_utterance=on_utterance,
+                      on_frame=lambda jpeg, host, rig_id: None)
+    net.start()
+    assert net.ready.wait(5.0)
+
+    # Hold the only worker so every rig's queue fills before anything runs
+    asyncio.run_coroutine_threadsafe(scheduler.submit("gate", gate.wait), net.loop)
+    _wait_for(lambda: scheduler.busy == 1)
+
+    rigs = [f"RIG-{i}" for i in range(N_RIGS)]
+    sends = {rig: 2 for rig in rigs}
+    sends["RIG-0"] = 6  # One chatty rig
+    for rig, n in sends.items():
+        for _ in range(n): _send_utterance(ears, rig)
+    _wait_for(lambda: len(arrived) == sum(sends.values()))
+
+    gate.set()
+    _wait_for(lambda: len(results) == sum(sends.values()))
+
+    # Only the chatty rig shed work, and only beyond its own max_pending
+    shed = [rig for rig, r in results if r is None]
+    assert sorted(shed) == ["RIG-0"] * 4
+    assert scheduler.dropped == 4
+    for rig in rigs:
+        assert sum(1 for r, res in results if r == rig and res == 8192) == 2
+
+    # Round-robin: every rig is served once per round, in the same rotation
+    first, second = served[:N_RIGS], served[N_RIGS:]
+    assert sorted(first) == sorted(rigs)
+    assert second == first
+
+
+def test_every_worker_takes_a_job():
+    scheduler = FairScheduler("parallel", workers=2, max_pending=2)
+
+    async def four_rigs():
+        return await asyncio.gather(*(scheduler.submit(f"RIG-{i}", time.sleep, 0.2) for i in range(4)))
+
+    start = time.perf_counter()
+    asyncio.run(four_rigs())
+    assert time.perf_counter() - start < 0.5   # Two rounds of two, not one worker running them back-to-back
+    assert scheduler.completed == 4
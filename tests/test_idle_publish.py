@@ -0,0 +1,30 @@
+import uuid
+
+import main
+from rig_sessions import SessionRegistry
+from state_shm import SEQ, BODY_SIZE, unpack_state
+
+
+def published(state):
+    """What a dashboard would read (StateReader in this same process would unregister the block)."""
+    buf = state.publisher.shm.buf
+    return unpack_state(bytes(buf[SEQ.size:SEQ.size + BODY_SIZE])) if SEQ.unpack_from(buf, 0)[0] else None
+
+
+def test_readiness_is_published_without_telemetry(monkeypatch):
+    registry = SessionRegistry(lambda rig_id, host: main.SharedState(rig_id))
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main.model_loader, "status", "loading")
+    state = registry.resolve("127.0.0.1", rig_id=f"T-{uuid.uuid4().hex[:8]}")
+    try:
+        assert published(state) is None
+        main.publish_idle_sessions()
+        assert published(state).brain_status == "loading"
+
+        main.model_loader.status = "ready"
+        state.last_publish -= main.IDLE_PUBLISH_INTERVAL
+        main.publish_idle_sessions()
+        assert published(state).brain_status == "ready"
+    finally:
+        state.publisher.close()
+        state.vision_publisher.close()
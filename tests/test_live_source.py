@@ -0,0 +1,36 @@
+import pytest
+
+import main
+from state_shm import StateView
+
+
+def test_idle_view_renders_without_a_rig():
+    source = main.LiveSource()
+    idle = StateView()
+    snap = source.health(idle)
+    assert (snap["packets"], snap["malformed"]) == ({}, 0)
+    assert "render" in snap
+    assert source.vision(idle) is None
+    source.toggle(idle)  # Display-only state: no-op, no error
+    assert source.rig_label(idle) == "RIG: --"
+
+
+def test_dashboard_frame_times_reach_the_snapshot_api(monkeypatch):
+    pytest.importorskip("pygame")
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    import dashboard
+
+    class QuitAfter(main.LiveSource):
+        frames = 0
+        def current(self):
+            QuitAfter.frames += 1
+            if QuitAfter.frames == 5: pygame.event.post(pygame.event.Event(pygame.QUIT))
+            return super().current()
+
+    monkeypatch.setattr(main, "render_health", main.TelemetryHealth(main.FPS))
+    dashboard.run_dashboard(QuitAfter(), render_health=main.render_health)
+    render = main.LiveSource().health(StateView())["render"]
+    assert render["frames"] == 5
+    assert render["frame_avg_ms"] > 0
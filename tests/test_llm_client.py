@@ -0,0 +1,85 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("ollama")
+
+from llm_client import LLMClient
+from prompt_builder import ConversationMemory, SYSTEM_PREFIX, build_messages
+
+TOKEN_CHARS = 3  # The stub's "tokenizer": fixed-size chunks of the templated prompt
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """/api/chat with a one-slot prefix cache: only tokens after the prefix shared
+    with the previous prompt count as evaluated, like Ollama's KV cache reuse."""
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is observable
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        templated = "".join(f"<|{m['role']}|>\n{m['content']}<|end|>\n" for m in body["messages"])
+        tokens = [templated[i:i + TOKEN_CHARS] for i in range(0, len(templated), TOKEN_CHARS)]
+        shared = 0
+        for a, b in zip(tokens, server.cached):
+            if a != b: break
+            shared += 1
+        server.cached = tokens
+        server.requests.append({"keep_alive": body.get("keep_alive"), "port": self.client_address[1],
+                                "tokens": len(tokens)})
+        evaluated = len(tokens) - shared
+        out = json.dumps({
+            "model": body["model"], "created_at": "2024-01-01T00:00:00Z", "done": True,
+            "message": {"role": "assistant", "content": f"Gap is stable, push {len(server.requests)}."},
+            "prompt_eval_count": evaluated, "prompt_eval_duration": evaluated * 1_000_000,
+            "eval_duration": 5_000_000,
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args): pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    server.cached, server.requests = [], []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class State:
+    vision_data = None
+    telemetry = {"pos": "P3", "gap_ahead": 1.2, "gap_behind": 0.4, "speed": 287}
+
+
+def test_prefix_reuse_and_prompt_eval_against_stub_server(stub_server):
+    llm = LLMClient("llama3.2", f"http://127.0.0.1:{stub_server.server_address[1]}", keep_alive="30m")
+    memory = ConversationMemory(max_turns=6, token_budget=600)
+
+    # Warm-up: cold cache, calibrates the token estimate
+    llm.chat([{'role': 'system', 'content': SYSTEM_PREFIX}, {'role': 'user', 'content': 'Radio check.'}])
+    assert llm.last["cache_reuse_est"] == 0.0
+
+    for question in ("How's the gap ahead?", "Tyres okay?", "Can I push now?"):
+        messages, user_content = build_messages(memory, State(), question)
+        reply = llm.chat(messages)
+        memory.add(user_content, reply)
+        real = stub_server.requests[-1]["tokens"]
+        assert abs(llm.last["prompt_tokens_est"] - real) / real < 0.25
+        assert llm.last["prompt_eval_count"] < real / 2          # Shared prefix was not re-evaluated
+        assert llm.last["cache_reuse_est"] > 0.5
+        assert llm.last["prompt_eval_ms"] == llm.last["prompt_eval_count"]
+
+    snap = llm.snapshot()
+    assert snap["calls"] == 4
+    assert 0.0 < snap["cache_reuse_est_avg"] < 1.0
+    assert {r["keep_alive"] for r in stub_server.requests} == {"30m"}
+    assert len({r["port"] for r in stub_server.requests}) == 1      # One pooled connection
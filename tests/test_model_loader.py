@@ -0,0 +1,64 @@
+import sys
+import types
+
+import pytest
+
+import model_loader
+from model_loader import DEGRADED, READY, ModelLoader
+
+
+class FakeWhisper:
+    """Loads on any device, but CUDA only fails once it transcribes (missing cuBLAS/cuDNN)."""
+    loaded = []
+    cuda_broken = True
+
+    def __init__(self, name, device, compute_type):
+        self.device = device
+        FakeWhisper.loaded.append(device)
+
+    def transcribe(self, audio, **kwargs):
+        if self.device == "cuda" and self.cuda_broken: raise RuntimeError("libcublas.so.12 not found")
+        return iter(()), None
+
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    FakeWhisper.loaded = []
+    FakeWhisper.cuda_broken = True
+    monkeypatch.setitem(sys.modules, "faster_whisper",
+                        types.SimpleNamespace(WhisperModel=FakeWhisper))
+
+
+def test_failed_warm_up_falls_back_to_cpu(fake_whisper):
+    loader = ModelLoader("tiny")
+    loader.run()
+    assert FakeWhisper.loaded == ["cuda", "cpu"]
+    assert loader.device == "cpu/int8"
+    assert loader.ears.device == "cpu"
+    assert loader.status == DEGRADED and loader.detail == "CPU fallback"
+
+
+def test_llm_coming_online_clears_degraded(fake_whisper, monkeypatch):
+    FakeWhisper.cuda_broken = False
+    monkeypatch.setattr(model_loader, "LLM_RETRY_INTERVAL", 0.01)
+    online = []
+
+    def warm_llm():
+        if not online: raise ConnectionError("ollama not running")
+
+    loader = ModelLoader("tiny", warm_llm=warm_llm)
+    loader.start()
+    for _ in range(200):
+        if loader.time_to_ready is not None: break
+        loader.join(0.01)
+    assert loader.status == DEGRADED and loader.detail == "LLM offline"
+
+    online.append(True)  # Background retry picks it up
+    loader.join(2.0)
+    assert not loader.is_alive()
+    assert loader.status == READY and loader.detail == ""
+
+    loader.report_llm(False)  # A real query failing flips it back, and a success clears it again
+    assert loader.status == DEGRADED
+    loader.report_llm(True)
+    assert loader.status == READY
@@ -0,0 +1,26 @@
+import socket
+
+import pytest
+
+import main
+from net_core import NetworkCore
+
+
+def test_bind_failure_is_reported_and_main_exits(free_port, monkeypatch):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as blocker:
+        blocker.bind(("0.0.0.0", 0))
+        taken = blocker.getsockname()[1]
+
+        net = NetworkCore(taken, free_port(socket.SOCK_STREAM), free_port(socket.SOCK_STREAM),
+                          on_packet=None, on_utterance=None, on_frame=None)
+        net.start()
+        assert net.ready.wait(5.0)
+        assert isinstance(net.error, OSError)
+
+        monkeypatch.setattr(main, "UDP_PORT", taken)
+        monkeypatch.setattr(main, "RELAY", {})
+        monkeypatch.setattr(main.model_loader, "start", lambda: None)
+        monkeypatch.setattr("sys.argv", ["main.py", "--headless"])
+        with pytest.raises(SystemExit) as exit_info:
+            main.main()
+        assert exit_info.value.code == 1
@@ -0,0 +1,186 @@
+import asyncio
+import socket
+import threading
+import time
+import uuid
+
+import pytest
+
+import main
+import relay
+from relay import FRAME, KEY, DELTA, MAGIC, RECORD_SIZE, RelayClient, TelemetryRelay, pad_record
+from rig_sessions import SessionRegistry
+from state_shm import BODY_SIZE, LAYOUT_VERSION, pack_state, unpack_state
+
+HEALTH = {"packets": {}, "malformed": 0}
+
+
+class State:
+    """Frame n of a synthetic race: the player's lap time and every car's position move each frame."""
+    def __init__(self, rig_id, n):
+        self.rig_id = rig_id
+        self.active = True
+        self.vision_data = None
+        self.player_idx = 3
+        self.telemetry = {"speed": 200 + n % 100, "lap_time": n * 16, "sector": 1 + n // 200 % 3,
+                          "gap_ahead": 1.25, "gap_behind": 0.5, "pos": "P4"}
+        self.cars = {i: {'team': i % 10, 'name': f"C{i:02d}", 'x': i * 10.0 + n, 'z': 5.0, 'dist': 1000.0 - i * 20 + n}
+                     for i in range(20)}
+        self.standings = [(i, self.cars[i], 0.2 * i) for i in range(20)]
+
+
+def body(rig_id, n):
+    buf = bytearray(BODY_SIZE)
+    pack_state(buf, State(rig_id, n), HEALTH, "ready", 4.2)
+    return buf
+
+
+def same_view(a, b):
+    return {k: v for k, v in vars(a).items() if k != "standings"} == \
+           {k: v for k, v in vars(b).items() if k != "standings"}
+
+
+@pytest.fixture
+def running_relay(free_port):
+    """TelemetryRelay on its own event loop; records() advances every rig one frame per tick."""
+    frame = {"n": 0}
+    history = {}   # (rig_id, n) -> body, to check what clients decode
+
+    def records():
+        frame["n"] += 1
+        out = []
+        for rig_id in ("RIG-A", "RIG-B"):
+            b = body(rig_id, frame["n"])
+            history[(rig_id, frame["n"])] = bytes(b)
+            out.append((rig_id, b))
+        return out
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    port = free_port(socket.SOCK_DGRAM)
+    r = TelemetryRelay(records, port, max_hz=60, keyframe_interval=30)
+    asyncio.run_coroutine_threadsafe(r.start(loop), loop).result(5.0)
+    yield r, port, history
+
+    async def shutdown():
+        for task in asyncio.all_tasks():
+            if task is not asyncio.current_task(): task.cancel()
+        r.transport.close()
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5.0)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def collect(clients, seconds):
+    views = {c: [] for c in clients}
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        for c in clients: views[c] += c.poll(timeout=0.002)
+    return views
+
+
+def test_loopback_rates_equality_and_delta_size(running_relay):
+    r, port, history = running_relay
+    fast, mid, slow = (RelayClient("127.0.0.1", port, "RIG-A", hz) for hz in (60, 20, 5))
+    both = RelayClient("127.0.0.1", port, "*", 10)
+    views = collect([fast, mid, slow, both], 2.0)
+
+    assert len(views[fast]) > len(views[mid]) > len(views[slow]) > 0
+    assert len(views[slow]) <= 2.0 * 5 + 2                       # Per-subscriber rate cap
+    assert {v.rig_id for v in views[both]} == {"RIG-A", "RIG-B"}
+
+    # Every decoded view equals the state the Brain published for that frame
+    for c in (fast, mid, slow, both):
+        for v in views[c]:
+            n = v.telemetry["lap_time"] // 16
+            assert same_view(v, unpack_state(history[(v.rig_id, n)]))
+        assert c.resyncs == 0 and c.rejected == 0
+
+    avg = fast.bytes / fast.frames
+    assert avg < 0.5 * (FRAME.size + RECORD_SIZE)                # Deltas, not full records
+    snap = r.snapshot()
+    assert snap["subscribers"] == 4 and snap["keyframes"] < snap["frames"] / 5
+    for c in (fast, mid, slow, both): c.close()
+
+
+def test_resync_after_a_dropped_delta(running_relay):
+    r, port, history = running_relay
+    client = RelayClient("127.0.0.1", port, "RIG-A", 30)
+    handle, dropped = client._handle, []
+
+    def lossy_handle(data):
+        if not dropped and client.frames >= 3 and data[5] == DELTA:
+            dropped.append(data)  # Lost on the "network"
+            return None
+        return handle(data)
+
+    client._handle = lossy_handle
+    views = collect([client], 1.5)[client]
+    assert dropped and client.resyncs >= 1
+    after = [v for v in views if v.telemetry["lap_time"] // 16 > FRAME.unpack_from(dropped[0])[4]]
+    assert len(after) > 10                                        # Keyframe requested, stream resumed
+    for v in after:
+        assert same_view(v, unpack_state(history[(v.rig_id, v.telemetry["lap_time"] // 16)]))
+    client.close()
+
+
+def test_client_drops_undecodable_frames():
+    client = RelayClient("127.0.0.1", 9, "RIG-A", 10)
+    never_published = FRAME.pack(MAGIC, LAYOUT_VERSION, KEY, b"RIG-A", 1, 0) + pad_record(bytearray(BODY_SIZE))
+    truncated = FRAME.pack(MAGIC, LAYOUT_VERSION, KEY, b"RIG-A", 2, 0) + b"\x00" * 10
+    good = FRAME.pack(MAGIC, LAYOUT_VERSION, KEY, b"RIG-A", 3, 0) + pad_record(body("RIG-A", 7))
+    short_delta = FRAME.pack(MAGIC, LAYOUT_VERSION, DELTA, b"RIG-A", 4, 3) + b"\xff" * relay.BITMAP_SIZE
+    assert client._handle(never_published) is None
+    assert client._handle(truncated) is None
+    assert client._handle(good).telemetry["lap_time"] == 7 * 16
+    assert client._handle(short_delta) is None
+    assert client.rejected == 3
+    client.close()
+
+
+def test_relay_skips_rigs_that_never_published(monkeypatch):
+    registry = SessionRegistry(lambda rig_id, host: main.SharedState(rig_id))
+    monkeypatch.setattr(main, "registry", registry)
+    idle = registry.resolve("127.0.0.1", rig_id=f"T-{uuid.uuid4().hex[:8]}")
+    live = registry.resolve("127.0.0.2", rig_id=f"T-{uuid.uuid4().hex[:8]}")
+    try:
+        assert main.relay_records() == []
+        live.publish(time.perf_counter())
+        assert [rig_id for rig_id, _ in main.relay_records()] == [live.rig_id]
+    finally:
+        for s in (idle, live):
+            s.publisher.close()
+            s.vision_publisher.close()
+
+
+def test_sub_without_echoed_nonce_gets_no_stream(running_relay):
+    r, port, _ = running_relay
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.3)
+    relay_addr = ("127.0.0.1", port)
+
+    def received(seconds):
+        got, end = [], time.monotonic() + seconds
+        while time.monotonic() < end:
+            try: got.append(sock.recvfrom(65536)[0])
+            except socket.timeout: pass
+        return got
+
+    sock.sendto(b"SUB * 60", relay_addr)               # Shorter than the reply: not answered at all
+    assert received(0.3) == []
+    sock.sendto(b"SUB * 60".ljust(relay.SUB_PAD), relay_addr)
+    replies = received(0.3)
+    assert len(replies) == 1 and replies[0].startswith(relay.NONCE_PREFIX)
+    assert len(replies[0]) <= relay.SUB_PAD             # Never amplifies
+    assert r.subscribers == {}
+
+    sock.sendto(b"SUB * 60 0123456789abcdef", relay_addr)  # Guessed nonce
+    assert all(d.startswith(relay.NONCE_PREFIX) for d in received(0.3))
+    assert r.subscribers == {}
+
+    nonce = replies[0][len(relay.NONCE_PREFIX):]
+    sock.sendto(b"SUB * 60 " + nonce, relay_addr)
+    frames = received(0.3)
+    assert frames and all(d.startswith(MAGIC) for d in frames)
+    assert len(r.subscribers) == 1
+    sock.sendto(b"BYE", relay_addr)
+    sock.close()
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+import main
+import response_cache
+from rig_sessions import SessionRegistry
+from response_cache import ResponseCache, normalize_transcript, telemetry_signature
+
+
+class State:
+    def __init__(self, pos="P3", gap_ahead=1.2, gap_behind=0.4, speed=287):
+        self.vision_data = None
+        self.telemetry = {"pos": pos, "gap_ahead": gap_ahead, "gap_behind": gap_behind, "speed": speed}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_normalize_transcript():
+    assert normalize_transcript("  Uh, what's the GAP ahead, mate?") == "what s the gap ahead"
+    assert normalize_transcript("What's the gap ahead") == normalize_transcript("um what's the gap ahead please")
+    assert normalize_transcript("radio check") == "radio check"
+
+
+def test_hit_after_put():
+    cache, sig = ResponseCache(), telemetry_signature(State())
+    assert cache.get("RIG-1", "What's the gap?", sig) is None
+    cache.put("RIG-1", "What's the gap?", sig, "1.2 ahead, keep pushing.", 0.8)
+    assert cache.get("RIG-1", "uh what's the gap", sig) == "1.2 ahead, keep pushing."
+    assert cache.get("RIG-2", "What's the gap?", sig) is None        # Per rig
+    snap = cache.snapshot()
+    assert (snap["hits"], snap["misses"], snap["saved_ms"]) == (1, 2, 800.0)
+
+
+def test_ttl_expiry(clock):
+    cache, sig = ResponseCache(ttl=15.0), telemetry_signature(State())
+    cache.put("RIG-1", "gap", sig, "1.2", 0.5)
+    clock[0] += 14.9
+    assert cache.get("RIG-1", "gap", sig) == "1.2"
+    clock[0] += 0.2
+    assert cache.get("RIG-1", "gap", sig) is None
+    assert cache.snapshot()["entries"] == 0
+
+
+def test_lru_eviction():
+    cache, sig = ResponseCache(max_entries=2), telemetry_signature(State())
+    cache.put("RIG-1", "a", sig, "A", 0.1)
+    cache.put("RIG-1", "b", sig, "B", 0.1)
+    assert cache.get("RIG-1", "a", sig) == "A"                       # a is now most recent
+    cache.put("RIG-1", "c", sig, "C", 0.1)
+    assert cache.get("RIG-1", "b", sig) is None
+    assert cache.get("RIG-1", "a", sig) == "A"
+    assert cache.snapshot()["evictions"] == 1
+
+
+def test_invalidated_when_a_bucket_changes():
+    cache = ResponseCache()
+    cache.put("RIG-1", "gap", telemetry_signature(State(gap_ahead=1.2)), "1.2", 0.5)
+    cache.put("RIG-2", "gap", telemetry_signature(State(gap_ahead=1.2)), "1.2", 0.5)
+    assert cache.get("RIG-1", "gap", telemetry_signature(State(gap_ahead=1.4))) == "1.2"   # Same bucket
+    assert cache.get("RIG-1", "gap", telemetry_signature(State(gap_ahead=0.4))) is None    # DRS range now
+    assert cache.get("RIG-1", "gap", telemetry_signature(State(gap_ahead=1.2))) is None    # Dropped, not restored
+    assert cache.get("RIG-2", "gap", telemetry_signature(State(gap_ahead=1.2))) == "1.2"   # Other rig untouched
+    assert cache.get("RIG-1", "gap", telemetry_signature(State(pos="P2"))) is None
+    assert cache.snapshot()["invalidations"] == 1
+
+
+# --- THROUGH THE ENGINEER, WITH A STUB LLM ---
+class StubLLM:
+    def __init__(self):
+        self.calls = []
+        self.last = {"prompt_eval_count": 0, "prompt_tokens_est": 0, "prompt_eval_ms": 0.0,
+                     "cache_reuse_est": 0.0, "gen_ms": 0.0}
+
+    def chat(self, messages):
+        self.calls.append(messages)
+        return f"Answer {len(self.calls)}"
+
+
+class Loader:
+    ears = object()
+    status = "ready"
+
+    def report_llm(self, ok): pass
+
+
+class Voice:
+    def __init__(self): self.said = []
+    def speak(self, text): self.said.append(text)
+
+
+@pytest.fixture
+def engineer(monkeypatch):
+    registry = SessionRegistry(lambda rig_id, host: main.SharedState(rig_id))
+    monkeypatch.setattr(main, "registry", registry)
+    monkeypatch.setattr(main, "llm", StubLLM())
+    monkeypatch.setattr(main, "answer_cache", ResponseCache())
+    eng = main.RaceEngineer(Loader())
+    yield eng, registry
+    for s in registry.all():
+        s.publisher.close()
+        s.vision_publisher.close()
+
+
+def test_engineer_serves_repeats_from_cache_and_keeps_history(engineer, monkeypatch):
+    eng, registry = engineer
+    state = registry.resolve("127.0.0.1", rig_id="T-CACHE")
+    state.voice = Voice()
+    state.telemetry.update(pos="P3", gap_ahead=1.2, gap_behind=0.4, speed=287)
+    questions = iter(["What's the gap ahead?", "uh, what's the gap ahead?", "What's the gap ahead?"])
+    monkeypatch.setattr(eng, "transcribe", lambda raw: next(questions))
+
+    async def ask(): await eng.handle_utterance(b"\x00" * 8192, "127.0.0.1", "T-CACHE")
+
+    asyncio.run(ask())
+    asyncio.run(ask())                                  # Same question, same buckets: cached
+    assert len(main.llm.calls) == 1
+    assert state.voice.said == ["Answer 1", "Answer 1"]
+    assert len(state.memory.turns) == 2                 # The cached answer is in history too
+
+    state.telemetry["gap_ahead"] = 0.3                  # Into DRS range: the old answer is stale
+    asyncio.run(ask())
+    assert len(main.llm.calls) == 2
+    assert state.voice.said[-1] == "Answer 2"
+    assert [m["content"] for m in main.llm.calls[-1] if m["role"] == "assistant"] == ["Answer 1", "Answer 1"]
@@ -0,0 +1,85 @@
+from rig_sessions import SessionRegistry
+
+
+class Session:
+    def __init__(self, rig_id, host):
+        self.rig_id = rig_id
+        self.host = host
+        self.closed = False
+
+
+def registry(**kwargs):
+    closed = []
+    def on_evict(session):
+        session.closed = True
+        closed.append(session)
+    return SessionRegistry(Session, on_evict=on_evict, **kwargs), closed
+
+
+def test_alias_and_ip_keys():
+    reg = SessionRegistry(Session, {"10.0.0.2": "RIG-2", "10.0.0.3:20777": "RIG-3"})
+    assert reg.resolve("10.0.0.2", 5000).rig_id == "RIG-2"
+    assert reg.resolve("10.0.0.3", 20777).rig_id == "RIG-3"
+    assert reg.resolve("10.0.0.9", 5000).rig_id == "10.0.0.9"
+
+
+def test_handshake_joins_telemetry_from_same_host():
+    reg, closed = registry()
+    early = reg.resolve("10.0.0.5", 20777)            # Telemetry before any handshake
+    ears = reg.resolve("10.0.0.5", rig_id="RIG-5")    # PTT connects with RIG:RIG-5
+    assert reg.resolve("10.0.0.5", 20777) is ears      # Telemetry now lands in the same session
+    assert reg.all() == [ears]
+    assert closed == [early]
+
+
+def test_handshake_keeps_other_rigs_selected():
+    reg, _ = registry()
+    reg.resolve("10.0.0.1")
+    reg.resolve("10.0.0.2")
+    reg.cycle()
+    assert reg.current().host == "10.0.0.2"
+    reg.resolve("10.0.0.1", rig_id="RIG-1")
+    assert reg.current().host == "10.0.0.2"
+
+
+def test_session_cap_evicts_least_recently_heard():
+    reg, closed = registry(aliases={"10.0.0.1": "RIG-1"}, max_sessions=3)
+    listed = reg.resolve("10.0.0.1")
+    reg.resolve("10.0.0.2")
+    reg.resolve("10.0.0.3")
+    reg.resolve("10.0.0.2")                           # Still talking
+    reg.resolve("10.0.0.1")
+    reg.resolve("10.0.0.4")                           # Stray sender: 10.0.0.3 is the least recent
+    assert [s.host for s in closed] == ["10.0.0.3"]
+    assert [s.host for s in reg.all()] == ["10.0.0.1", "10.0.0.2", "10.0.0.4"]
+    assert not listed.closed
+
+
+def test_cap_of_listed_rigs_refuses_strangers():
+    reg, closed = registry(aliases={"10.0.0.1": "RIG-1", "10.0.0.2": "RIG-2"}, max_sessions=2)
+    reg.resolve("10.0.0.1"); reg.resolve("10.0.0.2")
+    assert reg.resolve("10.0.0.9") is None
+    assert reg.refused == 1 and not closed
+
+
+def test_idle_sessions_expire(monkeypatch):
+    import rig_sessions
+    now = [100.0]
+    monkeypatch.setattr(rig_sessions.time, "monotonic", lambda: now[0])
+    reg, closed = registry(aliases={"10.0.0.1": "RIG-1"}, idle_timeout=300.0)
+    reg.resolve("10.0.0.1"); reg.resolve("10.0.0.7"); reg.resolve("10.0.0.8")
+    now[0] += 200.0
+    reg.resolve("10.0.0.8")
+    now[0] += 150.0
+    reg.expire()
+    assert [s.host for s in closed] == ["10.0.0.7"]   # Listed RIG-1 stays, 10.0.0.8 spoke recently
+    assert [s.host for s in reg.all()] == ["10.0.0.1", "10.0.0.8"]
+
+
+def test_listed_only_ignores_unknown_hosts_and_ids():
+    reg, _ = registry(aliases={"10.0.0.1": "RIG-1"}, listed_only=True)
+    assert reg.resolve("10.0.0.9", 20777) is None
+    assert reg.resolve("10.0.0.9", rig_id="SPOOF") is None
+    assert reg.resolve("10.0.0.1", 20777).rig_id == "RIG-1"
+    assert reg.resolve("10.0.0.1", rig_id="RIG-1").rig_id == "RIG-1"
+    assert len(reg.all()) == 1 and reg.refused == 2
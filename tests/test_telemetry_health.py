@@ -0,0 +1,74 @@
+import struct
+
+import main
+from rig_sessions import SessionRegistry
+from telemetry_health import HEADER_SIZE, TelemetryHealth
+
+
+def packet(pid, frame, session_time=None, size=64):
+    data = bytearray(size)
+    data[5] = pid
+    struct.pack_into('<fI', data, 14, frame / 60.0 if session_time is None else session_time, frame)
+    return bytes(data)
+
+
+def feed(health, pid, frames):
+    for f in frames: health.record_packet(pid, packet(pid, f), 1e-6)
+    return health.snapshot()["packets"][pid]
+
+
+def test_sporadic_events_are_not_counted_as_drops():
+    stats = feed(TelemetryHealth(60), 3, [100, 101, 700, 1500, 1501])
+    assert stats["dropped"] == 0
+    assert stats["out_of_order"] == 0
+
+
+def test_same_frame_is_not_out_of_order():
+    stats = feed(TelemetryHealth(60), 3, [10, 10, 10, 11, 9])
+    assert stats["out_of_order"] == 1
+
+
+def test_drops_use_the_median_interval():
+    # Lap Data every 2 frames with one stray 1-frame gap; then frames 52 and 54 go missing
+    frames = [0, 2, 4, 5, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25, 27, 29, 31, 33, 35, 37,
+              39, 41, 43, 45, 47, 49, 51, 57, 59]
+    stats = feed(TelemetryHealth(60), 2, frames)
+    assert stats["dropped"] == 2        # min-gap stride would have said 5
+    assert stats["frame_gap"] == 2
+
+
+def test_no_drops_counted_before_the_interval_is_known():
+    assert feed(TelemetryHealth(60), 2, [0, 40, 42, 44])["dropped"] == 0
+
+
+def test_session_restart_resets_the_interval():
+    health = TelemetryHealth(60)
+    feed(health, 0, range(6000, 6040, 2))
+    health.record_packet(0, packet(0, 1, session_time=0.0), 1e-6)   # Flashback to frame 1
+    stats = feed(health, 0, range(2, 12))
+    assert stats["dropped"] == 0 and stats["out_of_order"] == 0
+
+
+def test_render_frames():
+    health = TelemetryHealth(fps_target=50)
+    for frame_s in (0.010, 0.030, 0.012):
+        health.record_frame(frame_s)
+    render = health.snapshot()["render"]
+    assert render["frames"] == 3 and render["over_budget"] == 1
+    assert render["frame_max_ms"] == 30.0 and render["budget_ms"] == 20.0
+
+
+def test_short_and_truncated_packets_are_counted_as_malformed(monkeypatch):
+    registry = SessionRegistry(lambda rig_id, host: main.SharedState(rig_id))
+    monkeypatch.setattr(main, "registry", registry)
+    try:
+        main.ingest_packet(b"\x00" * (HEADER_SIZE - 1), ("127.0.0.1", 5000))
+        main.ingest_packet(packet(2, 100, size=HEADER_SIZE + 10), ("127.0.0.1", 5000))  # Lap Data cut short
+        main.ingest_packet(packet(3, 101, size=HEADER_SIZE + 12), ("127.0.0.1", 5000))  # Complete Event
+        snap = registry.resolve("127.0.0.1", 5000).health.snapshot()
+        assert snap["malformed"] == 2
+        assert list(snap["packets"]) == [3]
+    finally:
+        for s in registry.all():
+            s.publisher.close()
+            s.vision_publisher.close()
@@ -0,0 +1,74 @@
+import pytest
+
+import main
+from timing import TimingIndex
+
+TRACK = 5003.0  # Not a multiple of the 25 m minisector
+
+
+def drive(index, car, start_d, start_t, speed, until_t, step=0.2, track=TRACK):
+    """Feeds constant-speed lapDistance samples, wrapping at the line like the game does."""
+    t, d = start_t, start_d
+    while t <= until_t + 1e-9:
+        index.update(car, d % track, t)
+        t += step; d += speed * step
+
+
+def test_constant_gap():
+    index = TimingIndex()
+    index.track_length = TRACK
+    drive(index, 0, 100.0, 0.0, 30.0, 10.0)
+    drive(index, 1, 40.0, 0.0, 30.0, 10.0)
+    assert index.interval(1, 0) == pytest.approx(2.0, abs=1e-6)
+
+
+def test_line_crossing_uses_real_track_length():
+    index = TimingIndex()
+    index.track_length = TRACK
+    index.update(0, 4993.0, 0.0)
+    index.update(0, 10.0, 0.2)                  # 20 m at 100 m/s: the line was 10 m in, at t = 0.1
+    assert index.crossings[0] == pytest.approx(0.1)
+
+
+def test_interval_across_the_line():
+    index = TimingIndex()
+    index.track_length = TRACK
+    drive(index, 0, 4900.0, 0.0, 80.0, 4.0)
+    drive(index, 1, 4820.0, 0.0, 80.0, 4.0)
+    assert index.interval(1, 0) == pytest.approx(1.0, abs=1e-6)
+
+
+def test_lap_length_falls_back_to_longest_lap_distance():
+    index = TimingIndex()
+    assert index.lap_length() == 0.0
+    drive(index, 0, 4800.0, 0.0, 80.0, 2.0)
+    assert 4900.0 < index.lap_length() <= TRACK
+
+
+class State:
+    def __init__(self):
+        self.player_idx = 1
+        self.telemetry = {"speed": 288, "pos": "P--", "gap_ahead": 0.0, "gap_behind": 0.0}
+        self.timing = TimingIndex()
+        self.cars = {}
+        self.standings = []
+
+
+def test_lapped_car_is_not_shown_on_the_leaders_tail():
+    state = State()
+    state.timing.track_length = TRACK
+    # Leader on lap 2 passes 990 m half a second before the backmarker does on lap 1
+    state.timing.update(0, 980.0, 100.0); state.timing.update(0, 1000.0, 100.25)
+    state.timing.update(1, 980.0, 100.5); state.timing.update(1, 1000.0, 100.75)
+    assert state.timing.interval(1, 0) == pytest.approx(0.5)
+    state.cars = {0: {'dist': TRACK + 1000.0, 'last_lap': 0.0}, 1: {'dist': 1000.0, 'last_lap': 0.0}}
+
+    main.update_standings(state)
+    (_, _, lead_gap), (_, _, gap) = state.standings
+    assert gap == pytest.approx(TRACK / 80.0)   # No lap time yet: a lap at the player's 288 KPH, not 0.5 s
+
+    state.cars[0]['last_lap'] = 92.4
+    main.update_standings(state)
+    (_, _, lead_gap), (_, _, gap) = state.standings
+    assert gap == pytest.approx(92.9)           # Interval at the shared boundary + the leader's last lap
+    assert state.telemetry["gap_ahead"] == gap
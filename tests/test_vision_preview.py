@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygame")
+
+from vision_preview import VisionPreview
+
+
+def jpeg(shade, size=(360, 640)):
+    """Synthetic camera frame: a solid colour with a white bar, so the decode has real content."""
+    img = np.full(size + (3,), (shade, 80, 200), dtype=np.uint8)
+    img[100:140, :] = 255
+    ok, buf = cv2.imencode(".jpg", img)
+    assert ok
+    return buf.tobytes()
+
+
+def wait_for(predicate, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.005)
+
+
+def test_submit_ignores_unchanged_keys_and_replaces_pending():
+    preview = VisionPreview()  # Not started: nothing takes the pending frame
+    now = time.time()
+    preview.submit((1, jpeg(10), now))
+    preview.submit((1, jpeg(10), now))
+    assert preview.skipped == 0 and preview.pending[0] == 1
+
+    preview.submit((2, jpeg(20), now))
+    preview.submit((3, jpeg(30), now))
+    assert preview.pending[0] == 3 and preview.submitted == 3
+    assert preview.skipped == 2
+    preview.submit(None)
+    assert preview.pending[0] == 3
+
+    assert preview.age() is None
+    snap = preview.snapshot()
+    assert snap["decoded"] == 0 and snap["age_ms"] is None and not snap["behind"]
+
+
+def test_decodes_the_newest_frame_at_half_size():
+    preview = VisionPreview()
+    preview.start()
+    received = time.time() - 0.5
+    preview.submit((7, jpeg(40), received))
+    wait_for(lambda: preview.frame is not None)
+
+    key, surface, pixels, when = preview.frame
+    assert key == 7 and when == received
+    assert surface.get_size() == (320, 180)
+    r, g, b = surface.get_at((10, 10))[:3]
+    assert abs(r - 200) < 8 and abs(g - 80) < 8 and abs(b - 40) < 8  # BGR swapped to RGB
+    assert preview.age() >= 0.5
+
+    snap = preview.snapshot()
+    assert snap["available"] and snap["decoded"] == 1 and snap["failed"] == 0
+    assert snap["decode_avg_ms"] > 0 and snap["decode_max_ms"] >= snap["decode_avg_ms"]
+    assert snap["age_ms"] >= 500 and not snap["behind"]
+
+    preview.submit((8, b"not a jpeg", time.time()))
+    wait_for(lambda: preview.failed == 1)
+    assert preview.frame[0] == 7 and preview.snapshot()["behind"]  # Old frame kept, flagged as behind